@@ -0,0 +1,63 @@
+"""
+帧构造微基准：对比逐次构造（build_frame + to_bytes + list 拼接）与预分配模板（FrameTemplate）
+每条命令的 CPU 开销。无需连接硬件。
+
+    python -m benchmarks.bench_frame_build
+"""
+import timeit
+from motor.protocol import *
+from motor.motor import LkMotor
+
+N = 200000
+
+
+class _SinkBus:
+    """丢弃所有写入的总线，只用于测量 LkMotor 命令路径本身的 CPU 开销"""
+    ser = None
+
+    def transact(self, frame, expect_reply_len=0, timeout=None):
+        return b''
+
+
+def legacy_torque_frame(iq: float) -> bytes:
+    iq_int = int(round(iq * (2048 / 33.0)))
+    iq_int = max(-2048, min(2047, iq_int))
+    bytes_ = list(iq_int.to_bytes(2, 'little', signed=True))
+    return build_frame(0xA1, 1, bytes_)
+
+
+def legacy_position_speed_frame(angle_deg: float, speed_dps: float) -> bytes:
+    a = int(angle_deg * 100).to_bytes(8, 'little', signed=True)
+    s = int(speed_dps * 100).to_bytes(4, 'little')
+    return build_frame(0xA4, 1, list(a + s))
+
+
+def run(label: str, fn, number: int = N):
+    per_call = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print(f"{label:<40s} {per_call * 1e6:8.3f} µs/命令")
+    return per_call
+
+
+def main():
+    torque_tpl = FrameTemplate(0xA1, 1, PACK_I16)
+    pos_tpl = FrameTemplate(0xA4, 1, PACK_I64_U32)
+    assert bytes(torque_tpl.pack(iq_to_int(1.5))) == legacy_torque_frame(1.5)
+    assert bytes(pos_tpl.pack(9000, 3600)) == legacy_position_speed_frame(90.0, 36.0)
+
+    print("== 帧构造 ==")
+    before = run("0xA1 逐次构造", lambda: legacy_torque_frame(1.5))
+    after = run("0xA1 预分配模板", lambda: torque_tpl.pack(iq_to_int(1.5)))
+    print(f"{'加速比':<40s} {before / after:8.2f}x")
+    before = run("0xA4 逐次构造", lambda: legacy_position_speed_frame(90.0, 36.0))
+    after = run("0xA4 预分配模板", lambda: pos_tpl.pack(9000, 3600))
+    print(f"{'加速比':<40s} {before / after:8.2f}x")
+
+    print("== LkMotor 命令路径（不含串口 I/O）==")
+    motor = LkMotor(motor_id=1, bus=_SinkBus())
+    run("set_torque_nm", lambda: motor.set_torque_nm(0.1))
+    run("move_to_position_with_speed", lambda: motor.move_to_position_with_speed(90.0, 36.0))
+    run("send_command(0xA1, list)", lambda: motor.send_command(0xA1, [0x10, 0x00]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+驱动性能基准套件：在真实串口或仿真端点上运行可复现的场景，输出机器可读的 JSON。
+
+    python -m benchmarks.run --sim                       # pty 仿真端点
+    python -m benchmarks.run --port /dev/ttyUSB0 --ids 1 --port2 /dev/ttyUSB1 --ids2 2
+    python -m benchmarks.run --sim --json result.json --duration 5
+
+场景：
+- single_refresh   单电机 refresh()（0x92 + 0x9C）
+- torque_stream    单电机观测模式扭矩流（0xA1 一写一读）
+- mutual_control   双电机互控，与 double_control.py 相同的每拍流程
+- group_poll       N 电机同一总线 MotorGroup.refresh_all() 流水线轮询
+
+每个场景报告：实际频率、单拍往返耗时分位数、线上字节率、每拍 CPU 时间（仅基准线程）。
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from motor.bus import LkBus
+from motor.motor import LkMotor
+from motor.group import MotorGroup
+from motor.stats import LatencyHistogram
+
+KP = 2.0 / 2 / 6 / 1.5
+KD = 0.01 / 1.5
+TORQUE_LIMIT = 2.5
+
+
+def measure(tick, buses, duration: float) -> dict:
+    """不限速地重复执行 tick，统计频率、单拍耗时、线上字节率与 CPU 时间"""
+    latency = LatencyHistogram(resolution=5e-6)
+    sent0 = sum(bus.bytes_sent for bus in buses)
+    recv0 = sum(bus.bytes_received for bus in buses)
+    stale0 = sum(bus.stale_frames for bus in buses)
+    header0 = sum(bus.parser.header_errors for bus in buses)
+    checksum0 = sum(bus.parser.checksum_errors for bus in buses)
+    ticks = 0
+    cpu0 = time.thread_time()
+    start = time.perf_counter()
+    end = start + duration
+    now = start
+    while now < end:
+        tick()
+        done = time.perf_counter()
+        latency.record(done - now)
+        now = done
+        ticks += 1
+    elapsed = now - start
+    cpu = time.thread_time() - cpu0
+    sent = sum(bus.bytes_sent for bus in buses) - sent0
+    recv = sum(bus.bytes_received for bus in buses) - recv0
+    return {
+        "ticks": ticks,
+        "achieved_hz": ticks / elapsed,
+        "tick_latency_s": {
+            "p50": latency.percentile(50),
+            "p90": latency.percentile(90),
+            "p99": latency.percentile(99),
+            "max": latency.max,
+            "mean": latency.mean,
+        },
+        "bytes_per_s": {"sent": sent / elapsed, "received": recv / elapsed, "total": (sent + recv) / elapsed},
+        "cpu_per_tick_s": cpu / ticks if ticks else 0.0,
+        "stale_frames": sum(bus.stale_frames for bus in buses) - stale0,
+        "parser_header_errors": sum(bus.parser.header_errors for bus in buses) - header0,
+        "parser_checksum_errors": sum(bus.parser.checksum_errors for bus in buses) - checksum0,
+    }
+
+
+def scenario_single_refresh(bus_a, ids_a, bus_b, ids_b, duration):
+    motor = LkMotor(bus=bus_a, motor_id=ids_a[0])
+    return measure(motor.refresh, [bus_a], duration)
+
+
+def scenario_torque_stream(bus_a, ids_a, bus_b, ids_b, duration):
+    motor = LkMotor(bus=bus_a, motor_id=ids_a[0], observe=True)
+    result = measure(lambda: motor.set_torque_nm(0.0), [bus_a], duration)
+    motor.set_torque_nm(0.0)
+    return result
+
+
+def scenario_mutual_control(bus_a, ids_a, bus_b, ids_b, duration):
+    motor1 = LkMotor(bus=bus_a, motor_id=ids_a[0])
+    motor2 = LkMotor(bus=bus_b, motor_id=ids_b[0])
+
+    def tick():
+        motor1.refresh()
+        motor2.refresh()
+        if not (motor1.is_valid() and motor2.is_valid()):
+            return
+        torque1 = KP * (motor2.position - motor1.position) + KD * (motor2.velocity - motor1.velocity)
+        torque1 = max(-TORQUE_LIMIT, min(TORQUE_LIMIT, torque1))
+        motor1.set_torque_nm(torque1)
+        motor2.set_torque_nm(-torque1)
+
+    buses = [bus_a] if bus_b is bus_a else [bus_a, bus_b]
+    result = measure(tick, buses, duration)
+    motor1.set_torque_nm(0.0)
+    motor2.set_torque_nm(0.0)
+    return result
+
+
+def scenario_group_poll(bus_a, ids_a, bus_b, ids_b, duration):
+    group = MotorGroup()
+    for motor_id in ids_a:
+        group.add_motor(f"m{motor_id}", LkMotor(bus=bus_a, motor_id=motor_id))
+    result = measure(group.refresh_all, [bus_a], duration)
+    result["motors"] = len(ids_a)
+    return result
+
+
+SCENARIOS = {
+    "single_refresh": scenario_single_refresh,
+    "torque_stream": scenario_torque_stream,
+    "mutual_control": scenario_mutual_control,
+    "group_poll": scenario_group_poll,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LK 电机驱动基准套件")
+    parser.add_argument("--sim", action="store_true", help="使用 pty 仿真端点代替真实串口")
+    parser.add_argument("--port", help="主总线串口")
+    parser.add_argument("--port2", help="第二条总线串口（mutual_control，缺省与主总线相同）")
+    parser.add_argument("--ids", type=int, nargs="+", default=None, help="主总线电机 ID（group_poll 使用全部）")
+    parser.add_argument("--ids2", type=int, nargs="+", default=None, help="第二条总线电机 ID")
+    parser.add_argument("--baudrate", type=int, default=460800)
+    parser.add_argument("--sim-latency", type=float, default=0.0002, help="仿真驱动应答延迟（秒）")
+    parser.add_argument("--duration", type=float, default=2.0, help="每个场景运行时间（秒）")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--json", help="结果写入文件（默认输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    sims = []
+    if args.sim:
+        from motor.simulator import SimulatedBus
+        ids = args.ids or [1, 2, 3, 4, 5, 6]
+        ids2 = args.ids2 or [ids[-1] + 1]
+        sims = [SimulatedBus(ids, baudrate=args.baudrate, reply_latency=args.sim_latency, seed=0).start(),
+                SimulatedBus(ids2, baudrate=args.baudrate, reply_latency=args.sim_latency, seed=1).start()]
+        port, port2 = sims[0].port, sims[1].port
+    else:
+        if not args.port:
+            parser.error("需要 --port 或 --sim")
+        ids = args.ids or [1]
+        port = args.port
+        port2 = args.port2 or args.port
+        ids2 = args.ids2 or (ids[1:2] if port2 == port and len(ids) > 1 else ids[:1])
+
+    bus_a = LkBus(port, args.baudrate)
+    bus_b = bus_a if port2 == port else LkBus(port2, args.baudrate)
+
+    report = {
+        "meta": {
+            "transport": "simulated" if args.sim else "serial",
+            "port": port,
+            "port2": port2,
+            "baudrate": args.baudrate,
+            "ids": ids,
+            "ids2": ids2,
+            "duration_s": args.duration,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+    try:
+        for name in args.scenarios:
+            report["scenarios"][name] = SCENARIOS[name](bus_a, ids, bus_b, ids2, args.duration)
+            print(f"{name:<16s} {report['scenarios'][name]['achieved_hz']:9.1f} Hz", file=sys.stderr)
+    finally:
+        bus_a.close()
+        if bus_b is not bus_a:
+            bus_b.close()
+        for sim in sims:
+            sim.close()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
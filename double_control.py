@@ -1,5 +1,7 @@
 from motor.motor import LkMotor
 from motor.protocol import radian_to_degree
+from motor.loop import LoopRunner
+from motor.recorder import TelemetryRecorder
 import time
 
 # KP = 2.0 / 2 / 6 / 2
@@ -10,9 +12,14 @@ KD = 0.01 / 1.5
 
 TORQUE_LIMIT = 2.5
 DT = 0.01
+REPORT_EVERY = 100
 
-motor1 = LkMotor("/dev/ttyUSB1", motor_id=1)
-motor2 = LkMotor("/dev/ttyUSB0", motor_id=2)
+# 二进制遥测日志，可用 python encoder_value_to_graph.py double_control.bin 绘图
+recorder = TelemetryRecorder("double_control.bin")
+
+# keepalive：量化后扭矩未变时最多 50 ms 才重发一次，把带宽留给状态读取
+motor1 = LkMotor("/dev/ttyUSB1", motor_id=1, recorder=recorder, keepalive=0.05)
+motor2 = LkMotor("/dev/ttyUSB0", motor_id=2, recorder=recorder, keepalive=0.05)
 
 print("启动电机")
 motor1.enable()
@@ -25,55 +32,53 @@ motor2.set_zero_ram()
 time.sleep(0.2)
 
 print("开始双电机互控")
-try:
-    while True:
-        loop_start = time.perf_counter()
-        timestamp = time.strftime("[%H:%M:%S]", time.localtime())
 
-        time.sleep(0.01)
-        motor1.refresh()
-        time.sleep(0.01)
-        motor2.refresh()
 
-        if not (motor1.is_valid() and motor2.is_valid()):
-            # time.sleep(0.001)
-            continue
+def report(pos1, vel1, pos2, vel2, torque1, torque2):
+    """每 REPORT_EVERY 拍打印一次状态与循环统计；逐拍数据见遥测日志"""
+    print(time.strftime("[%H:%M:%S]", time.localtime()))
+    print(f"Motor1 - POS={radian_to_degree(pos1):+.2f}°, VEL={radian_to_degree(vel1):+.2f}°/s, TORQUE={motor1.getTorque():+.3f}Nm")
+    print(f"Motor2 - POS={radian_to_degree(pos2):+.2f}°, VEL={radian_to_degree(vel2):+.2f}°/s, TORQUE={motor2.getTorque():+.3f}Nm")
+    print(f"误差 Motor1 ← pos_error={radian_to_degree(pos2 - pos1):+.2f}°, vel_error={radian_to_degree(vel2 - vel1):+.2f}°/s, 输出扭矩={torque1:+.3f}Nm")
+    print(f"误差 Motor2 ← pos_error={radian_to_degree(pos1 - pos2):+.2f}°, vel_error={radian_to_degree(vel1 - vel2):+.2f}°/s, 输出扭矩={torque2:+.3f}Nm")
+    stats = runner.stats()
+    print(f"hz = {stats['achieved_hz']:.2f} Hz, overruns = {stats['overruns']}, "
+          f"jitter p99 = {stats['period_jitter']['p99'] * 1e3:.2f} ms, "
+          f"step p99 = {stats['step_latency']['p99'] * 1e3:.2f} ms")
+    print("-" * 100)
+
 
-        pos1, vel1 = motor1.getPosition(), motor1.getVelocity()
-        pos2, vel2 = motor2.getPosition(), motor2.getVelocity()
+def step():
+    motor1.refresh()
+    motor2.refresh()
 
-        pos_error_1 = pos2 - pos1
-        vel_error_1 = vel2 - vel1
+    if not (motor1.is_valid() and motor2.is_valid()):
+        return
 
-        pos_error_2 = pos1 - pos2
-        vel_error_2 = vel1 - vel2
+    pos1, vel1 = motor1.getPosition(), motor1.getVelocity()
+    pos2, vel2 = motor2.getPosition(), motor2.getVelocity()
 
-        torque1 = KP * pos_error_1 + KD * vel_error_1
-        print(f"pos_torque1:{KP * pos_error_1:.2f}, vel_torque1:{KD * vel_error_1:.2f}")
-        torque2 = KP * pos_error_2 + KD * vel_error_2
-        print(f"pos_torque1:{KP * pos_error_2:.2f}, vel_torque1:{KD * vel_error_2:.2f}")
+    torque1 = KP * (pos2 - pos1) + KD * (vel2 - vel1)
+    torque2 = KP * (pos1 - pos2) + KD * (vel1 - vel2)
 
-        torque1 = max(-TORQUE_LIMIT, min(TORQUE_LIMIT, torque1))
-        torque2 = max(-TORQUE_LIMIT, min(TORQUE_LIMIT, torque2))
+    torque1 = max(-TORQUE_LIMIT, min(TORQUE_LIMIT, torque1))
+    torque2 = max(-TORQUE_LIMIT, min(TORQUE_LIMIT, torque2))
 
-        print(f"{timestamp}")
-        print(f"Motor1 - POS={radian_to_degree(pos1):+.2f}°, VEL={radian_to_degree(vel1):+.2f}°/s, TORQUE={motor1.getTorque():+.3f}Nm")
-        print(f"Motor2 - POS={radian_to_degree(pos2):+.2f}°, VEL={radian_to_degree(vel2):+.2f}°/s, TORQUE={motor2.getTorque():+.3f}Nm")
-        print(f"误差 Motor1 ← pos_error={radian_to_degree(pos_error_1):+.2f}°, vel_error={radian_to_degree(vel_error_1):+.2f}°/s, 输出扭矩={torque1:+.3f}Nm")
-        print(f"误差 Motor2 ← pos_error={radian_to_degree(pos_error_2):+.2f}°, vel_error={radian_to_degree(vel_error_2):+.2f}°/s, 输出扭矩={torque2:+.3f}Nm")
-        
-        loop_end = time.perf_counter()
-        elapsed = loop_end - loop_start
-        # print(f"elapsed: {elapsed:.2f} s")
-        print(f"hz = {1/elapsed:.2f} Hz")
-        print("-" * 100)
+    motor1.set_torque_nm(torque1)
+    motor2.set_torque_nm(torque2)
 
-        motor1.set_torque_nm(torque1)
-        motor2.set_torque_nm(torque2)   
+    # 终端输出很慢，只在报告拍打印，不占用其余控制拍
+    if runner.ticks % REPORT_EVERY == 0:
+        report(pos1, vel1, pos2, vel2, torque1, torque2)
 
-        # time.sleep(max(0, DT - (loop_end - loop_start)))
+
+runner = LoopRunner(step, rate_hz=1 / DT)
+
+try:
+    runner.run()
 
 except KeyboardInterrupt:
     print("控制中断，关闭电机")
     motor1.disable()
     motor2.disable()
+    recorder.close()
@@ -1,7 +1,28 @@
 import re
+import sys
 import matplotlib.pyplot as plt
 
-with open('log.txt', 'r', encoding='utf-8') as f:
+# 用法：python encoder_value_to_graph.py [log.txt | telemetry.bin]
+# .bin 为 TelemetryRecorder 写出的二进制遥测日志，直接载入 numpy 数组；否则按文本日志解析
+path = sys.argv[1] if len(sys.argv) > 1 else 'log.txt'
+
+if path.endswith('.bin'):
+    from motor.recorder import load_telemetry
+
+    records = load_telemetry(path)
+    plt.figure(figsize=(10, 6))
+    for motor_id in sorted(set(records['motor_id'].tolist())):
+        rows = records[records['motor_id'] == motor_id]
+        plt.plot(rows['timestamp'] - records['timestamp'][0], rows['encoder'], label=f'Motor {motor_id}')
+    plt.title('Encoder Value Over Time')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Encoder Value')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+    sys.exit(0)
+
+with open(path, 'r', encoding='utf-8') as f:
     log_data = f.read()
 
 encoder_values = [int(match) for match in re.findall(r"'encoder_value':\s*(\d+)", log_data)]
@@ -14,4 +35,4 @@ plt.title('Encoder Value Over Time')
 plt.xlabel('Record Index')
 plt.ylabel('Encoder Value')
 plt.grid(True)
-plt.show()
\ No newline at end of file
+plt.show()
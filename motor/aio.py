@@ -0,0 +1,320 @@
+import asyncio
+import os
+import time
+import serial
+from motor.protocol import *
+from motor.protocol import np
+from motor.motor import LkMotor
+from motor.group import MotorGroup
+from motor.stats import BusStats
+
+
+class AsyncLkBus:
+    """
+    asyncio 版本的总线对象：串口以非阻塞方式打开，由事件循环在 fd 可读时喂给 FrameParser，
+    应答帧按 (命令, 电机 ID) 分发给等待中的 Future。同一总线的事务由 asyncio.Lock 串行化，
+    不同总线之间完全并发。
+    """
+    def __init__(self, port: str, baudrate: int = 460800, timeout: float = 0.02):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.ser = serial.Serial(port=port, baudrate=baudrate, timeout=0)
+        if not self.ser.is_open:
+            self.ser.open()
+        self.parser = FrameParser()
+        self.stale_frames = 0
+        self.stats = BusStats(port)
+        self._waiters = {}
+        self._loop = None
+        self._lock = None
+
+    def _attach(self):
+        """首次使用时绑定当前事件循环并注册读回调"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._lock = asyncio.Lock()
+            self._loop.add_reader(self.ser.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            chunk = os.read(self.ser.fileno(), 4096)
+        except BlockingIOError:
+            return
+        self.parser.feed(chunk)
+        for frame in self.parser.frames():
+            waiter = self._waiters.pop((frame[1], frame[2]), None)
+            if waiter is None or waiter.done():
+                self.stale_frames += 1
+                continue
+            waiter.set_result(frame)
+
+    def wire_time(self, n_bytes: int) -> float:
+        """n 字节在总线上的传输时间（8N1，每字节 10 bit）"""
+        return n_bytes * 10.0 / self.baudrate
+
+    async def _wait_replies(self, keys: list, timeout: float) -> dict:
+        """登记等待的 (命令, 电机 ID) 并等待应答；写出后到让出事件循环之前登记，不会漏帧"""
+        futures = {}
+        for key in keys:
+            futures[key] = self._loop.create_future()
+            self._waiters[key] = futures[key]
+        try:
+            await asyncio.wait(futures.values(), timeout=timeout)
+        finally:
+            for key in keys:
+                if self._waiters.get(key) is futures[key]:
+                    del self._waiters[key]
+        return {key[1]: fut.result() for key, fut in futures.items() if fut.done()}
+
+    async def transact(self, frame: bytes, expect_reply_len: int = 0, timeout: float = None) -> bytes:
+        """发送一帧；expect_reply_len > 0 时等待对应应答并校验长度"""
+        self._attach()
+        if timeout is None:
+            timeout = self.timeout
+        stats = self.stats.get(frame[2], frame[1])
+        async with self._lock:
+            stats.requests += 1
+            stats.bytes_sent += len(frame)
+            if expect_reply_len <= 0:
+                self.ser.write(frame)
+                return b''
+            key = (frame[1], frame[2])
+            parser = self.parser
+            header_errors, checksum_errors = parser.header_errors, parser.checksum_errors
+            start = time.perf_counter()
+            self.ser.write(frame)
+            replies = await self._wait_replies([key], timeout + self.wire_time(len(frame) + expect_reply_len))
+            stats.header_errors += parser.header_errors - header_errors
+            stats.checksum_errors += parser.checksum_errors - checksum_errors
+        if frame[2] not in replies:
+            stats.timeouts += 1
+            raise MotorTimeoutError("Timeout or incomplete response")
+        resp = replies[frame[2]]
+        stats.replies += 1
+        stats.bytes_received += len(resp)
+        stats.latency.record(time.perf_counter() - start)
+        if len(resp) != expect_reply_len:
+            raise MotorProtocolError(f"Unexpected reply length {len(resp)}, expected {expect_reply_len}")
+        return resp
+
+    async def transact_many(self, cmd: int, requests: dict[int, list[int]], expect_reply_len: int = 0) -> dict[int, bytes]:
+        """对多个电机连发同一命令，返回 {motor_id: 应答帧}"""
+        burst = b''.join(build_frame(cmd, motor_id, data) for motor_id, data in requests.items())
+        return await self.transact_burst(burst, cmd, list(requests), expect_reply_len)
+
+    async def transact_burst(self, burst: bytes, cmd: int, motor_ids: list[int], expect_reply_len: int = 0) -> dict[int, bytes]:
+        """一次写出预先编码好的多帧，并按电机 ID 收集应答"""
+        self._attach()
+        get_stats = self.stats.get
+        frame_len = len(burst) // len(motor_ids) if motor_ids else 0
+        async with self._lock:
+            for motor_id in motor_ids:
+                stats = get_stats(motor_id, cmd)
+                stats.requests += 1
+                stats.bytes_sent += frame_len
+            if expect_reply_len <= 0:
+                self.ser.write(burst)
+                return {}
+            keys = [(cmd, motor_id) for motor_id in motor_ids]
+            parser = self.parser
+            header_errors, checksum_errors = parser.header_errors, parser.checksum_errors
+            start = time.perf_counter()
+            self.ser.write(burst)
+            timeout = self.timeout + self.wire_time(len(burst) + expect_reply_len * len(motor_ids))
+            replies = await self._wait_replies(keys, timeout)
+            latency = time.perf_counter() - start
+            if parser.header_errors != header_errors or parser.checksum_errors != checksum_errors:
+                stats = get_stats(0, cmd)
+                stats.header_errors += parser.header_errors - header_errors
+                stats.checksum_errors += parser.checksum_errors - checksum_errors
+        result = {}
+        for motor_id in motor_ids:
+            resp = replies.get(motor_id)
+            stats = get_stats(motor_id, cmd)
+            if resp is None or len(resp) != expect_reply_len:
+                stats.timeouts += 1
+                continue
+            stats.replies += 1
+            stats.bytes_received += len(resp)
+            stats.latency.record(latency)
+            result[motor_id] = resp
+        return result
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.remove_reader(self.ser.fileno())
+        self.ser.close()
+
+
+class AsyncLkMotor(LkMotor):
+    """
+    LkMotor 的 asyncio 版本：所有命令方法返回可 await 的协程，例如
+    `await motor.refresh()`、`await motor.set_torque_nm(0.1)`。
+    命令负载构造与应答解析完全复用 LkMotor，只替换 send_frame / query_frame 两个 I/O 原语。
+    """
+    def __init__(self, port: str = None, baudrate: int = 460800, motor_id: int = 1, observe: bool = False,
+                 bus: AsyncLkBus = None, recorder=None, policy=None, param_cache=None, keepalive: float = None):
+        super().__init__(port, baudrate, motor_id, observe,
+                         bus=bus if bus is not None else AsyncLkBus(port, baudrate), recorder=recorder,
+                         policy=policy, param_cache=param_cache, keepalive=keepalive)
+
+    def send_frame(self, frame, expect_reply_len: int = 0, timeout: float = None):
+        # 模板缓冲区会被下一条命令原地改写，必须在调用时（而非 await 时）复制
+        return self.bus.transact(bytes(frame), expect_reply_len, timeout)
+
+    def query_frame(self, frame, expect_reply_len: int, decode, timeout: float = None):
+        if expect_reply_len > 0 and timeout is None and self.policy is not None:
+            return self._query_adaptive(bytes(frame), expect_reply_len, decode)
+        return self._decode(frame[1], self.send_frame(frame, expect_reply_len, timeout), decode)
+
+    async def _query_adaptive(self, frame, expect_reply_len: int, decode):
+        """同 LkMotor._query_adaptive：自适应超时、预算内重试，最终失败时标记状态过期"""
+        policy = self.policy
+        cmd = frame[1]
+        wire = self.bus.wire_time(len(frame) + expect_reply_len)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            sent = time.perf_counter()
+            try:
+                resp = await self.send_frame(frame, expect_reply_len, policy.timeout)
+                break
+            except MotorTimeoutError:
+                policy.on_timeout()
+                now = time.perf_counter()
+                if cmd in NON_IDEMPOTENT_COMMANDS or not policy.can_retry(attempt, now - start,
+                                                                          policy.timeout + wire):
+                    self.state.mark_stale()
+                    raise
+                attempt += 1
+                self.bus.stats.get(self.motor_id, cmd).retries += 1
+        latency = time.perf_counter() - sent
+        policy.observe(max(latency - wire, 0.0))
+        result = decode(resp)
+        self.record(cmd, latency)
+        return result
+
+    async def _decode(self, cmd: int, pending, decode):
+        start = time.perf_counter()
+        result = decode(await pending)
+        self.record(cmd, time.perf_counter() - start)
+        return result
+
+    async def _logged(self, pending, what: str):
+        try:
+            return await pending
+        except Exception as e:
+            print(f"[Motor ID {self.motor_id}] {what}: {e}")
+
+    @staticmethod
+    async def _immediate(value):
+        return value
+
+    async def read_param(self, param_id: int):
+        # 固件版本核对须先 await 完成，父类中的同步调用在此只会得到未执行的协程
+        cache = self.param_cache
+        if cache is not None and cache.needs_verify(self.cache_key):
+            await self.read_device_info()
+        return await super().read_param(param_id)
+
+    def _send_closed_loop_frame(self, frame, coalesce: bool = True):
+        # 抑制判断与帧复制在调用时完成（模板缓冲区随后会被改写），设定值在 await 成功之后才记为已发送，
+        # 发送失败的设定值不会让之后相同的命令被省去
+        if coalesce and self.setpoint_unchanged(frame):
+            self.suppressed += 1
+            return self._immediate(None)
+        if not self.observe:
+            pending = self.query_frame(frame, 0, self._ignore_reply)
+        else:
+            pending = self.query_frame(frame, 13, self.apply_status2_reply)
+        if not coalesce or self.keepalive is None:
+            return pending
+        return self._setpoint_delivered(bytes(frame), pending)
+
+    async def _setpoint_delivered(self, frame: bytes, pending):
+        result = await pending
+        self.setpoint_sent(frame)
+        return result
+
+    def _send_raw_frame(self, frame):
+        return self._logged(self._send_closed_loop_frame(frame), "快速命令失败")
+
+    def set_torque(self, iq: float):
+        return self._logged(self._send_packed(0xA1, PACK_I16, iq_to_int(iq)), "发送扭矩失败")
+
+    async def refresh(self):
+        ok = True
+        if self.state.needs_multi_turn():
+            try:
+                await self.query(0x92, [], 14, self._on_multi_turn_reply)
+            except Exception as e:
+                ok = False
+                print(f"[Motor ID {self.motor_id}] 读取位置失败: {e}")
+
+        try:
+            await self.query(0x9C, [], 13, self.apply_status2_reply)
+        except Exception as e:
+            ok = False
+            print(f"[Motor ID {self.motor_id}] 读取速度失败: {e}")
+        if not ok:
+            self.state.mark_stale()  # 同 LkMotor.refresh()：任一半未更新都不把整份状态当作最新
+
+
+class AsyncMotorGroup(MotorGroup):
+    """
+    MotorGroup 的 asyncio 版本：各总线的批量事务并发执行，
+    一轮刷新的耗时取决于最慢的一条总线，而不是所有总线之和。
+    """
+    async def _refresh_bus(self, bus, motors: dict):
+        start = time.perf_counter()
+        wanted = self._multi_turn_requests(motors)
+        angles = await bus.transact_many(0x92, wanted, expect_reply_len=14) if wanted else {}
+        statuses = await bus.transact_many(0x9C, {mid: [] for mid in motors}, expect_reply_len=13)
+        self._apply_refresh(motors, angles, statuses, time.perf_counter() - start, wanted)
+
+    async def refresh_all(self):
+        await asyncio.gather(*(self._refresh_bus(bus, motors) for bus, motors in self._by_bus().items()))
+
+    async def _command_bus(self, bus, motors: dict, cmd: int, payloads: dict, results: dict):
+        requests, reply_len = self._command_requests(motors, payloads, cmd)
+        if not requests:
+            return
+        start = time.perf_counter()
+        replies = await bus.transact_many(cmd, requests, expect_reply_len=reply_len)
+        self._apply_command_replies(motors, replies, results, cmd, time.perf_counter() - start, requests)
+
+    async def command_all(self, cmd: int, payloads: dict[str, list[int]]):
+        results = {}
+        await asyncio.gather(*(self._command_bus(bus, motors, cmd, payloads, results)
+                               for bus, motors in self._by_bus(payloads).items()))
+        return results
+
+    async def _torque_batch_bus(self, bus, motor_ids, iq, motors):
+        observing = any(motor.observe for motor in motors)
+        start = time.perf_counter()
+        replies = await bus.transact_burst(encode_torque_batch(motor_ids, iq), 0xA1, motor_ids,
+                                           13 if observing else 0)
+        self._apply_burst_replies(motors, replies, 0xA1, time.perf_counter() - start)
+
+    async def set_torque_nm_batch(self, names, torques, kt: float = 0.09):
+        """同 MotorGroup.set_torque_nm_batch，各总线并发下发"""
+        iq = np.asarray(torques, dtype=np.float64) / kt
+        await asyncio.gather(*(self._torque_batch_bus(bus, motor_ids, iq[index], motors)
+                               for bus, motor_ids, index, motors in self._plan(tuple(names))))
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        by_cmd = {}
+        for (name, cmd), data in pending.items():
+            by_cmd.setdefault(cmd, {})[name] = data
+        results = {}
+        for cmd, payloads in by_cmd.items():
+            results.update(await self.command_all(cmd, payloads))
+        return results
+
+    async def enable_all(self):
+        await asyncio.gather(*(motor.enable() for motor in self.motors.values()))
+
+    async def disable_all(self):
+        await asyncio.gather(*(motor.disable() for motor in self.motors.values()))
@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import NamedTuple
+
+
+class MotorSnapshot(NamedTuple):
+    """某一时刻的电机状态快照（不可变），由后台线程整体替换发布"""
+    position: float      # 多圈角度，弧度
+    velocity: float      # 速度，弧度/s
+    torque: float        # 力矩，Nm
+    temperature: int     # 温度，℃
+    seq: int             # 发布序号，每次轮询 +1
+    timestamp: float     # 位置/速度中较旧一份的采集时刻（time.perf_counter）
+    stale: bool = False  # 电机无应答或后台轮询出错后置位：快照不再更新，数据仅供参考
+
+
+class BackgroundPoller:
+    """
+    后台 I/O 线程：按固定频率轮询电机状态并下发排队的设定值。
+    - 状态以 MotorSnapshot 发布到 motor.snapshot，读取方无需加锁，直接取最新引用
+    - 设定值通过 submit() 排队，每个电机只保留最新一条，由后台线程在下一轮发送
+    可传入 MotorGroup（同一总线流水线刷新）或 LkMotor 列表。
+    """
+    def __init__(self, motors, rate_hz: float = 500.0):
+        self.group = motors if hasattr(motors, "refresh_all") else None
+        self.motors = self.group.all_motors() if self.group is not None else list(motors)
+        self.period = 1.0 / rate_hz
+        self._pending = {}
+        self._seq = 0
+        self._running = False
+        self._thread = None
+        self.overruns = 0  # 单轮耗时超过周期的次数
+        self.errors = 0    # poll_once() 抛出异常的轮数
+        self.last_error = None  # 当前连续失败中最近一次的异常，恢复后清空
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lk-motor-io", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, motor, method: str, *args, **kwargs):
+        """
+        排队一条设定值命令，例如 submit(m, "set_torque_nm", 0.2)。
+        同一电机未发送的旧命令会被覆盖。
+        """
+        self._pending[motor] = (method, args, kwargs)
+
+    @staticmethod
+    def snapshot(motor):
+        """读取电机最新快照（可能为 None）"""
+        return motor.snapshot
+
+    def poll_once(self):
+        """执行一轮：下发设定值 → 刷新状态 → 发布快照"""
+        for motor in self.motors:
+            pending = self._pending.pop(motor, None)
+            if pending is None:
+                continue
+            method, args, kwargs = pending
+            try:
+                getattr(motor, method)(*args, **kwargs)
+            except Exception as e:
+                print(f"[Motor ID {motor.motor_id}] 后台发送 {method} 失败: {e}")
+
+        if self.group is not None:
+            self.group.refresh_all()
+        else:
+            for motor in self.motors:
+                motor.refresh()
+
+        self._seq += 1
+        for motor in self.motors:
+            if motor.is_valid():
+                motor.snapshot = MotorSnapshot(motor.position, motor.velocity, motor.torque,
+                                               motor.temperature, self._seq, motor.state.stamp)
+            elif motor.snapshot is not None and not motor.snapshot.stale:
+                # refresh() 内部捕获了超时并把状态标记为过期：旧快照同样不能再当作最新数据
+                motor.snapshot = motor.snapshot._replace(stale=True)
+
+    def _mark_stale(self):
+        """本轮失败：电机状态与已发布快照都标记为过期，读取方可据 snapshot.stale 判断"""
+        for motor in self.motors:
+            motor.state.mark_stale()
+            if motor.snapshot is not None and not motor.snapshot.stale:
+                motor.snapshot = motor.snapshot._replace(stale=True)
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while self._running:
+            try:
+                self.poll_once()
+                if self.last_error is not None:
+                    print(f"[后台轮询] 已恢复（累计失败 {self.errors} 轮）")
+                    self.last_error = None
+            except Exception as e:
+                # 串口错误、解析错误等不能让线程静默退出，否则读取方只会看到不断变旧的快照；
+                # 连续失败只打印第一次，避免终端输出拖慢轮询
+                self.errors += 1
+                if self.last_error is None:
+                    print(f"[后台轮询] 失败: {e}")
+                self.last_error = e
+                self._mark_stale()
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.overruns += 1
+                next_tick = time.perf_counter()
@@ -0,0 +1,238 @@
+import contextlib
+import threading
+import time
+from motor.protocol import *
+from motor.stats import BusStats
+from motor.transport import open_transport
+
+READ_SLICE = 0.001  # 单次串口 read 的最长阻塞时间（秒）
+
+
+class LkBus:
+    """
+    一条 RS485 总线（一个串口）上的所有电机共享的端口对象。
+    字节收发经由传输对象 self.ser（见 motor.transport：本地串口、TCP/UDP 串口服务器、回放、回环）。
+    负责串口的独占与收发加锁，并支持多电机流水线事务：
+    一次性写出所有请求帧，再按帧头中的电机 ID 分拣应答。
+    接收端基于 FrameParser 流式解析，不再清空输入缓冲区，迟到的旧应答会被识别并丢弃。
+    每个事务按（电机 ID, 命令）计入 self.stats（BusStats）：请求/应答/超时数、字节数、往返耗时，
+    以及等待应答期间解析器发现的帧头错误与校验错误。
+    """
+    def __init__(self, port: str, baudrate: int = 460800, timeout: float = 0.02, pipelined: bool = True,
+                 backend: str = "pyserial"):
+        """
+        - port: 串口设备名、传输地址（"tcp://host:port" 等，见 open_transport）或传输对象
+        - timeout: 等待一条应答的最长时间（秒）
+        - pipelined: 是否连发多帧请求；若驱动/转换器无法容忍连发，可设为 False 退化为逐个往返
+        - backend: "pyserial"，或 "posix" 使用 termios 低延迟后端（motor.posix_serial.PosixSerial）
+        """
+        self.port = port if isinstance(port, str) else str(port)
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.pipelined = pipelined
+        # 单次 read 的阻塞上限取较短的时间片，_read_frame 在片间检查截止时间，
+        # 使短于总线超时的自适应等待时间真正生效
+        self.ser = open_transport(port, baudrate, min(timeout, READ_SLICE), backend)
+        if not self.ser.is_open:
+            self.ser.open()
+        self._read = getattr(self.ser, "read_view", self.ser.read)  # 支持时读入复用缓冲区
+        self._expect_reply = getattr(self.ser, "expect_reply", None)  # 支持时按应答长度设定唤醒阈值
+        self.lock = threading.RLock()
+        self.parser = FrameParser()
+        self.stale_frames = 0  # 丢弃的迟到/未请求应答帧数
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.deadline_limit = None  # 见 limit_deadline()
+        self.stats = BusStats(port)
+
+    def wire_time(self, n_bytes: int) -> float:
+        """n 字节在总线上的传输时间（8N1，每字节 10 bit）"""
+        return n_bytes * 10.0 / self.baudrate
+
+    def _drain(self):
+        """发送前读走已到达的字节：其中的完整帧都是过期应答，直接丢弃；残缺帧留在解析器中"""
+        waiting = self.ser.in_waiting
+        if waiting:
+            self.bytes_received += waiting
+            self.parser.feed(self.ser.read(waiting))
+        for _ in self.parser.frames():
+            self.stale_frames += 1
+
+    def _read_frame(self, deadline: float):
+        """读取下一条完整帧，超过 deadline 返回 None"""
+        parser = self.parser
+        while True:
+            frame = parser.next_frame()
+            if frame is not None:
+                return frame
+            if time.perf_counter() >= deadline:
+                parser.resync()
+                return None
+            chunk = self._read(parser.needed())
+            if chunk:
+                self.bytes_received += len(chunk)
+                parser.feed(chunk)
+
+    def read_reply(self, cmd: int, motor_id: int, deadline: float) -> bytes:
+        """等待指定命令、指定电机的应答帧，其余帧视为过期丢弃"""
+        while True:
+            frame = self._read_frame(deadline)
+            if frame is None:
+                raise MotorTimeoutError("Timeout or incomplete response")
+            if frame[1] == cmd and frame[2] == motor_id:
+                return frame
+            self.stale_frames += 1
+
+    def transact(self, frame: bytes, expect_reply_len: int = 0, timeout: float = None) -> bytes:
+        """
+        发送一帧；expect_reply_len > 0 时等待对应应答并校验长度。
+        - timeout: 本次等待应答的时间（秒），默认使用总线超时
+        """
+        if timeout is None:
+            timeout = self.timeout
+        stats = self.stats.get(frame[2], frame[1])
+        with self.lock:
+            self._drain()
+            if expect_reply_len > 0 and self._expect_reply is not None:
+                self._expect_reply(expect_reply_len)
+            start = time.perf_counter()
+            self.ser.write(frame)
+            self.bytes_sent += len(frame)
+            stats.requests += 1
+            stats.bytes_sent += len(frame)
+
+            if expect_reply_len > 0:
+                parser = self.parser
+                header_errors, checksum_errors = parser.header_errors, parser.checksum_errors
+                deadline = start + timeout + self.wire_time(len(frame) + expect_reply_len)
+                if self.deadline_limit is not None:
+                    deadline = min(deadline, self.deadline_limit)
+                try:
+                    resp = self.read_reply(frame[1], frame[2], deadline)
+                except MotorTimeoutError:
+                    stats.timeouts += 1
+                    raise
+                finally:
+                    stats.header_errors += parser.header_errors - header_errors
+                    stats.checksum_errors += parser.checksum_errors - checksum_errors
+                stats.replies += 1
+                stats.bytes_received += len(resp)
+                stats.latency.record(time.perf_counter() - start)
+                if len(resp) != expect_reply_len:
+                    raise MotorProtocolError(f"Unexpected reply length {len(resp)}, expected {expect_reply_len}")
+                return resp
+            return b''
+
+    def transact_many(self, cmd: int, requests: dict[int, list[int]], expect_reply_len: int = 0,
+                      timeout: float = None) -> dict[int, bytes]:
+        """
+        对多个电机发送同一命令：
+        - requests: {motor_id: data}
+        - timeout: 等待应答的时间（秒，不含线上传输时间），默认使用总线超时
+        - 返回 {motor_id: 应答帧}，未应答或校验失败的电机不出现在结果中
+        """
+        if not self.pipelined:
+            replies = {}
+            for motor_id, data in requests.items():
+                try:
+                    resp = self.transact(build_frame(cmd, motor_id, data), expect_reply_len, timeout)
+                except (MotorTimeoutError, MotorProtocolError):
+                    continue
+                if expect_reply_len > 0:
+                    replies[motor_id] = resp
+            return replies
+
+        burst = b''.join(build_frame(cmd, motor_id, data) for motor_id, data in requests.items())
+        return self.transact_burst(burst, cmd, list(requests), expect_reply_len, timeout)
+
+    def transact_burst(self, burst: bytes, cmd: int, motor_ids: list[int], expect_reply_len: int = 0,
+                       timeout: float = None) -> dict[int, bytes]:
+        """
+        一次写出预先编码好的多帧（如 encode_torque_batch 的输出），并按电机 ID 收集应答。
+        - motor_ids: burst 中各帧对应的电机 ID
+        突发期间的解析错误无法归属到具体电机，统计在 motor_id=0 名下。
+        """
+        replies = {}
+        get_stats = self.stats.get
+        frame_len = len(burst) // len(motor_ids) if motor_ids else 0
+        with self.lock:
+            self._drain()
+            if expect_reply_len > 0 and self._expect_reply is not None:
+                self._expect_reply(expect_reply_len * len(motor_ids))
+            start = time.perf_counter()
+            self.ser.write(burst)
+            self.bytes_sent += len(burst)
+            for motor_id in motor_ids:
+                stats = get_stats(motor_id, cmd)
+                stats.requests += 1
+                stats.bytes_sent += frame_len
+            if expect_reply_len <= 0:
+                return replies
+            parser = self.parser
+            header_errors, checksum_errors = parser.header_errors, parser.checksum_errors
+            deadline = start + (self.timeout if timeout is None else timeout) + self.wire_time(
+                len(burst) + expect_reply_len * len(motor_ids))
+            if self.deadline_limit is not None:
+                deadline = min(deadline, self.deadline_limit)
+            while len(replies) < len(motor_ids):
+                frame = self._read_frame(deadline)
+                if frame is None:
+                    break
+                if frame[1] != cmd or frame[2] not in motor_ids or len(frame) != expect_reply_len:
+                    self.stale_frames += 1
+                    continue
+                replies[frame[2]] = frame
+                stats = get_stats(frame[2], cmd)
+                stats.replies += 1
+                stats.bytes_received += len(frame)
+                stats.latency.record(time.perf_counter() - start)
+            for motor_id in motor_ids:
+                if motor_id not in replies:
+                    get_stats(motor_id, cmd).timeouts += 1
+            if parser.header_errors != header_errors or parser.checksum_errors != checksum_errors:
+                stats = get_stats(0, cmd)
+                stats.header_errors += parser.header_errors - header_errors
+                stats.checksum_errors += parser.checksum_errors - checksum_errors
+        return replies
+
+    @contextlib.contextmanager
+    def limit_deadline(self, deadline: float):
+        """
+        在此期间，所有事务等待应答都不超过绝对时刻 deadline（time.perf_counter()），
+        超出即按超时处理；供调度器把低优先级任务限制在本周期的剩余时间内
+        """
+        with self.lock:
+            previous = self.deadline_limit
+            self.deadline_limit = deadline if previous is None else min(previous, deadline)
+            try:
+                yield
+            finally:
+                self.deadline_limit = previous
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        批次内写出的请求暂存在传输中，在批次结束或首次等待应答时一次发出（UDP 合为一个数据报）；
+        传输不支持批次（如本地串口）时等同于只持有总线锁。
+        """
+        with self.lock:
+            begin = getattr(self.ser, "begin_batch", None)
+            if begin is None:
+                yield
+                return
+            begin()
+            try:
+                yield
+            finally:
+                self.ser.end_batch()
+
+    def set_baudrate(self, baudrate: int):
+        """在同一串口上切换波特率，并丢弃按旧波特率收到的残余字节"""
+        with self.lock:
+            self.ser.baudrate = baudrate
+            self.baudrate = baudrate
+            self.ser.reset_input_buffer()
+            del self.parser.buf[:]
+
+    def close(self):
+        self.ser.close()
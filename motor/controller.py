@@ -1,15 +1,45 @@
+import time
+from motor.protocol import np, _require_numpy
+
+
 class MITController:
     """
     MIT 控制器：
     - 每轮调用时执行一次 control step
     - 使用 motor1 的状态控制 motor2，反之亦然（对称控制）
+    - 传入 BackgroundPoller 时，step() 只读取最新快照并排队设定值，不阻塞在串口 I/O 上
+    - max_age: 对侧测量的最大允许时龄（秒），超过时按 on_stale 处理；None 表示不检查
+    - on_stale: "hold" 本拍不更新该电机的设定值（驱动保持上一条命令）；
+      "extrapolate" 以速度外推位置 q + dq·age 后照常下发
     """
 
-    def __init__(self, motor1, motor2, kp=2.0, kd=0.05):
+    def __init__(self, motor1, motor2, kp=2.0, kd=0.05, poller=None, max_age=None, on_stale="hold"):
+        if on_stale not in ("hold", "extrapolate"):
+            raise ValueError(f"未知的 on_stale 策略: {on_stale}")
         self.m1 = motor1
         self.m2 = motor2
         self.kp = kp
         self.kd = kd
+        self.poller = poller
+        self.max_age = max_age
+        self.on_stale = on_stale
+        self.stale_ticks = 0  # 因测量过期而保持或外推的次数
+
+    def _target(self, position, velocity, stamp, now):
+        """
+        由对侧测量得到本电机的目标 (q, dq)；测量过期且策略为 hold 时返回 None。
+        """
+        if position is None or velocity is None:
+            return None
+        if self.max_age is None or stamp is None:
+            return position, velocity
+        age = now - stamp
+        if age <= self.max_age:
+            return position, velocity
+        self.stale_ticks += 1
+        if self.on_stale == "hold":
+            return None
+        return position + velocity * age, velocity
 
     def step(self):
         """
@@ -17,19 +47,109 @@ class MITController:
         - 刷新状态
         - 相互计算并施加力矩（MIT控制律）
         """
+        if self.poller is not None:
+            self._step_async()
+            return
+
         self.m1.refresh()
         self.m2.refresh()
 
-        self.m1.apply_mit_control(
-            q_desired=self.m2.position,
-            dq_desired=self.m2.velocity,
-            kp=self.kp,
-            kd=self.kd
-        )
-
-        self.m2.apply_mit_control(
-            q_desired=self.m1.position,
-            dq_desired=self.m1.velocity,
-            kp=self.kp,
-            kd=self.kd
-        )
+        now = time.perf_counter()
+        target1 = self._target(self.m2.position, self.m2.velocity, self.m2.state.stamp, now)
+        target2 = self._target(self.m1.position, self.m1.velocity, self.m1.state.stamp, now)
+
+        if target1 is not None:
+            self.m1.apply_mit_control(
+                q_desired=target1[0],
+                dq_desired=target1[1],
+                kp=self.kp,
+                kd=self.kd
+            )
+
+        if target2 is not None:
+            self.m2.apply_mit_control(
+                q_desired=target2[0],
+                dq_desired=target2[1],
+                kp=self.kp,
+                kd=self.kd
+            )
+
+    def _step_async(self):
+        """基于后台快照的单步控制：任一电机尚无快照或快照已过期（后台轮询出错）时跳过本轮"""
+        s1 = self.m1.snapshot
+        s2 = self.m2.snapshot
+        if s1 is None or s2 is None:
+            return
+        if s1.stale or s2.stale:
+            self.stale_ticks += 1
+            return
+
+        now = time.perf_counter()
+        target1 = self._target(s2.position, s2.velocity, s2.timestamp, now)
+        target2 = self._target(s1.position, s1.velocity, s1.timestamp, now)
+        if target1 is not None:
+            self.poller.submit(self.m1, "apply_mit_control",
+                               q_desired=target1[0], dq_desired=target1[1], kp=self.kp, kd=self.kd)
+        if target2 is not None:
+            self.poller.submit(self.m2, "apply_mit_control",
+                               q_desired=target2[0], dq_desired=target2[1], kp=self.kp, kd=self.kd)
+
+
+class CoupledMITController:
+    """
+    N 电机耦合控制器（主从跟随、镜像、多对多耦合）：
+    每拍以 MotorGroup 的状态数组一次性计算所有关节力矩，
+        q_ref = C·q,  dq_ref = C·dq
+        τ = clip(kp·(q_ref − q) + kd·(dq_ref − dq), −τ_max, τ_max)
+    再按总线批量编码、连发 0xA1 扭矩命令。
+    - names: 参与控制的电机名称，决定数组顺序
+    - coupling: (N, N) 耦合矩阵 C；C[i, j] 为关节 i 跟随关节 j 的系数，全零行的关节不受控（如主手）
+      例：双电机互控 [[0, 1], [1, 0]]；电机 1 跟随电机 0 [[0, 0], [1, 0]]
+    - kp / kd / torque_limit: 标量或 (N,) 数组，kp 单位 Nm/rad，kd 单位 Nm·s/rad
+    - max_age: 测量最大允许时龄（秒），任一参与计算的电机超出时本拍不下发；None 表示不检查
+    """
+
+    def __init__(self, group, names, coupling, kp=2.0, kd=0.05, torque_limit=2.5, kt=0.09, max_age=None):
+        _require_numpy()
+        self.group = group
+        self.names = tuple(names)
+        n = len(self.names)
+        self.coupling = np.asarray(coupling, dtype=np.float64)
+        if self.coupling.shape != (n, n):
+            raise ValueError(f"耦合矩阵形状应为 ({n}, {n})，实际为 {self.coupling.shape}")
+        self.kp = np.broadcast_to(np.asarray(kp, dtype=np.float64), (n,)).copy()
+        self.kd = np.broadcast_to(np.asarray(kd, dtype=np.float64), (n,)).copy()
+        self.torque_limit = np.broadcast_to(np.asarray(torque_limit, dtype=np.float64), (n,)).copy()
+        self.kt = kt
+        self.max_age = max_age
+        self.driven = np.flatnonzero(np.any(self.coupling != 0, axis=1))  # 受控关节下标
+        self.driven_names = [self.names[i] for i in self.driven]
+        # 受控关节的耦合行与增益，步进时只算这些行
+        self._rows = self.coupling[self.driven]
+        self._kp = self.kp[self.driven]
+        self._kd = self.kd[self.driven]
+        self._limit = self.torque_limit[self.driven]
+        self.skipped_ticks = 0  # 因测量缺失或过期而未下发的次数
+        self.last_torque = np.zeros(len(self.driven))
+
+    def compute(self, q, dq):
+        """由全部关节的位置/速度数组计算受控关节的力矩（顺序同 driven_names）"""
+        driven = self.driven
+        torque = self._kp * (self._rows @ q - q[driven]) + self._kd * (self._rows @ dq - dq[driven])
+        return np.clip(torque, -self._limit, self._limit, out=torque)
+
+    def step(self, refresh: bool = True):
+        """单步：（可选）流水线刷新全部电机 → 向量化计算力矩 → 按总线批量下发"""
+        if refresh:
+            self.group.refresh_all()
+        q, dq, stamp = self.group.state_arrays(self.names)
+        if np.isnan(q).any() or np.isnan(dq).any():
+            self.skipped_ticks += 1
+            return None
+        if self.max_age is not None and time.perf_counter() - stamp.min() > self.max_age:
+            self.skipped_ticks += 1
+            return None
+        torque = self.compute(q, dq)
+        self.group.set_torque_nm_batch(self.driven_names, torque, self.kt)
+        self.last_torque = torque
+        return torque
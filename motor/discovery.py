@@ -0,0 +1,59 @@
+from motor.protocol import *
+from motor.bus import LkBus
+from motor.motor import LkMotor
+
+# 驱动支持的常用 RS485 波特率，按出现可能性排序
+COMMON_BAUDRATES = (460800, 115200, 500000, 1000000, 921600, 230400, 2000000, 2500000)
+ALL_IDS = range(1, 33)
+PROBE_CMD = 0x9A       # 读取状态1：只读、应答短（13 字节），适合作探测
+PROBE_REPLY_LEN = 13
+
+
+def probe_ids(bus: LkBus, ids=ALL_IDS, timeout: float = 0.003, rounds: int = 2) -> list[int]:
+    """
+    在当前波特率下对 ids 连发探测帧，返回有应答的电机 ID（升序）。
+    - timeout: 最后一帧发出后等待应答的时间（秒，不含线上传输时间）
+    - rounds: 对仍未应答的 ID 重复探测的轮数，抵御偶发丢帧
+    """
+    found = set()
+    pending = list(ids)
+    for _ in range(rounds):
+        if not pending:
+            break
+        replies = bus.transact_many(PROBE_CMD, {motor_id: [] for motor_id in pending}, PROBE_REPLY_LEN, timeout)
+        found.update(replies)
+        pending = [motor_id for motor_id in pending if motor_id not in replies]
+    return sorted(found)
+
+
+def discover(port: str, baudrates=None, ids=ALL_IDS, timeout: float = 0.003, read_info: bool = True,
+             sweep_all: bool = False, pipelined: bool = True) -> dict[int, dict]:
+    """
+    枚举一条总线上的电机：只打开一次串口，按 baudrates 依次切换波特率并连发探测帧。
+    - baudrates: 待尝试的波特率，默认只用 460800；传入 COMMON_BAUDRATES 可扫描常用波特率
+    - sweep_all: 为 False 时在第一个发现电机的波特率处停止
+    - read_info: 是否对每个发现的电机读取 0x12 设备信息
+    - pipelined: 是否连发探测帧（同 LkBus）；半双工转换器无法容忍连发时设为 False，逐个 ID 往返探测
+    返回 {电机 ID: 设备信息 dict}，其中附带 "baudrate"；未读取或读取失败时只含 "baudrate"（及 "error"）。
+    """
+    baudrates = baudrates or (460800,)
+    result = {}
+    bus = LkBus(port, baudrates[0], timeout=timeout, pipelined=pipelined)
+    try:
+        for baudrate in baudrates:
+            if bus.baudrate != baudrate:
+                bus.set_baudrate(baudrate)
+            found = [motor_id for motor_id in probe_ids(bus, ids, timeout) if motor_id not in result]
+            for motor_id in found:
+                entry = {"baudrate": baudrate}
+                if read_info:
+                    try:
+                        entry.update(LkMotor(bus=bus, motor_id=motor_id, policy=False).read_device_info())
+                    except (MotorTimeoutError, MotorProtocolError) as e:
+                        entry["error"] = str(e)
+                result[motor_id] = entry
+            if found and not sweep_all:
+                break
+    finally:
+        bus.close()
+    return result
@@ -1,6 +1,14 @@
+import time
+from motor.protocol import *
+from motor.protocol import np, _require_numpy
+from motor.state import ANGLE_RAW_TO_RAD, SPEED_RAW_TO_RAD_S
+
+
 class MotorGroup:
     def __init__(self):
         self.motors = {}
+        self._plans = {}  # 名称序列 → 按总线拆分的批量下发计划
+        self._pending = {}  # (电机名称, 命令) → 待发送的数据负载，只保留最新
 
     def add_motor(self, name: str, motor):
         """
@@ -14,12 +22,192 @@ class MotorGroup:
     def all_motors(self):
         return list(self.motors.values())
 
+    def _by_bus(self, names=None):
+        """按总线分组：{bus: {motor_id: motor}}"""
+        buses = {}
+        for name, motor in self.motors.items():
+            if names is not None and name not in names:
+                continue
+            buses.setdefault(motor.bus, {})[motor.motor_id] = motor
+        return buses
+
     def refresh_all(self):
         """
-        刷新所有电机的状态（适用于 MIT 控制预热阶段）
+        刷新所有电机的状态（适用于 MIT 控制预热阶段）。
+        同一总线上的电机以流水线方式批量读取：0x92 一次连发、0x9C 一次连发，按电机 ID 分拣应答。
+        """
+        for bus, motors in self._by_bus().items():
+            start = time.perf_counter()
+            wanted = self._multi_turn_requests(motors)
+            angles = bus.transact_many(0x92, wanted, expect_reply_len=14) if wanted else {}
+            statuses = bus.transact_many(0x9C, {mid: [] for mid in motors}, expect_reply_len=13)
+            self._apply_refresh(motors, angles, statuses, time.perf_counter() - start, wanted)
+
+    @staticmethod
+    def _multi_turn_requests(motors: dict) -> dict:
+        """本轮需要读取 0x92 的电机（启用软件多圈展开的电机只在建立/校正基准时读取）"""
+        return {mid: [] for mid, motor in motors.items() if motor.state.needs_multi_turn()}
+
+    @staticmethod
+    def _apply_refresh(motors: dict, angles: dict, statuses: dict, latency: float = 0.0, wanted=None):
+        """
+        将按电机 ID 分拣好的 0x92 / 0x9C 应答写回各电机状态（latency 为整条总线本轮耗时）。
+        - wanted: 本轮请求了 0x92 的电机 ID，默认全部
+        """
+        for motor_id, motor in motors.items():
+            requested = wanted is None or motor_id in wanted
+            if motor_id in angles:
+                motor.state.update_multi_turn(angles[motor_id])
+            elif requested:
+                print(f"[Motor ID {motor_id}] 读取位置失败: 无应答")
+            if motor_id in statuses:
+                motor.state.update_status2(statuses[motor_id])
+                motor.record(0x9C, latency)
+            else:
+                print(f"[Motor ID {motor_id}] 读取速度失败: 无应答")
+            if (requested and motor_id not in angles) or motor_id not in statuses:
+                motor.state.mark_stale()
+
+    def command_all(self, cmd: int, payloads: dict[str, list[int]]):
+        """
+        对多个电机批量发送同一闭环命令（0xA1~0xA8）：
+        - payloads: {电机名称: 数据负载}
+        同一总线上的帧一次连发；观测模式的电机按应答更新状态。
+        返回 {电机名称: MotorState}（仅包含有应答的观测模式电机）
+        """
+        results = {}
+        for bus, motors in self._by_bus(payloads).items():
+            requests, reply_len = self._command_requests(motors, payloads, cmd)
+            if not requests:
+                continue
+            start = time.perf_counter()
+            replies = bus.transact_many(cmd, requests, expect_reply_len=reply_len)
+            self._apply_command_replies(motors, replies, results, cmd, time.perf_counter() - start, requests)
+        return results
+
+    def _command_requests(self, motors: dict, payloads: dict, cmd: int = None):
+        """
+        生成单条总线的 {motor_id: data} 请求，以及期望应答长度（有观测模式电机时为 13）。
+        指定 cmd 时省去设定值未变（见 LkMotor.keepalive）的电机。
+        """
+        names = {motor: name for name, motor in self.motors.items()}
+        requests = {}
+        for mid, motor in motors.items():
+            data = payloads[names[motor]]
+            if cmd is not None and motor.keepalive is not None \
+                    and motor.setpoint_unchanged(build_frame(cmd, mid, data)):
+                motor.suppressed += 1
+                continue
+            requests[mid] = data
+        observing = any(motors[mid].observe for mid in requests)
+        return requests, 13 if observing else 0
+
+    def _apply_command_replies(self, motors: dict, replies: dict, results: dict, cmd: int = 0,
+                               latency: float = 0.0, requests: dict = None):
+        """
+        按闭环命令应答更新观测模式电机，并以电机名称收集状态；
+        requests 给出时记录已成功发送的设定值（观测模式电机以收到应答为准）
+        """
+        names = {motor: name for name, motor in self.motors.items()}
+        for motor_id, resp in replies.items():
+            motor = motors[motor_id]
+            if motor.observe:
+                results[names[motor]] = motor.apply_status2_reply(resp)
+                motor.record(cmd, latency)
+        for motor_id, data in (requests or {}).items():
+            motor = motors[motor_id]
+            if motor.keepalive is not None and (motor_id in replies or not motor.observe):
+                motor.setpoint_sent(build_frame(cmd, motor_id, data))
+
+    def submit(self, name: str, cmd: int, data: list[int]):
         """
+        排队一条闭环命令；同一电机同一命令未发送的旧负载被覆盖，由 flush() 统一批量发送
+        """
+        self._pending[(name, cmd)] = data
+
+    def flush(self):
+        """按命令分批发送全部排队的设定值，返回 {电机名称: MotorState}（同 command_all）"""
+        pending, self._pending = self._pending, {}
+        by_cmd = {}
+        for (name, cmd), data in pending.items():
+            by_cmd.setdefault(cmd, {})[name] = data
+        results = {}
+        for cmd, payloads in by_cmd.items():
+            results.update(self.command_all(cmd, payloads))
+        return results
+
+    def set_torque_nm_all(self, torques: dict[str, float], kt: float = 0.09):
+        """批量扭矩环控制：{电机名称: 扭矩（Nm）}"""
+        return self.command_all(0xA1, {name: iq_to_payload(t / kt) for name, t in torques.items()})
+
+    def _plan(self, names: tuple):
+        """
+        按固定的名称顺序预先计算各总线的 (bus, 电机 ID 列表, 在 names 中的下标数组, 电机列表)，
+        供向量化的批量下发复用
+        """
+        plan = self._plans.get(names)
+        if plan is None:
+            _require_numpy()
+            per_bus = {}
+            for index, name in enumerate(names):
+                motor = self.motors[name]
+                per_bus.setdefault(motor.bus, []).append((index, motor))
+            plan = self._plans[names] = [
+                (bus, [m.motor_id for _, m in entries], np.array([i for i, _ in entries]), [m for _, m in entries])
+                for bus, entries in per_bus.items()
+            ]
+        return plan
+
+    def state_arrays(self, names):
+        """
+        以 numpy 数组取出多个电机的 (位置 rad, 速度 rad/s, 采集时刻)，顺序与 names 相同；
+        尚无测量的电机为 NaN
+        """
+        _require_numpy()
+        motors = [self.motors[name] for name in names]
+        n = len(motors)
+        nan = float('nan')
+        angle = np.fromiter((nan if m.state.angle_raw is None else m.state.angle_raw for m in motors),
+                            np.float64, n)
+        speed = np.fromiter((nan if m.state.speed_raw is None else m.state.speed_raw for m in motors),
+                            np.float64, n)
+        stamp = np.fromiter((nan if m.state.stamp is None else m.state.stamp for m in motors), np.float64, n)
+        return angle * ANGLE_RAW_TO_RAD, speed * SPEED_RAW_TO_RAD_S, stamp
+
+    def set_torque_nm_batch(self, names, torques, kt: float = 0.09):
+        """
+        向量化的批量扭矩下发：torques 为与 names 同序的 (N,) 数组（Nm）。
+        每条总线用 encode_torque_batch 一次编码并连发；观测模式电机按应答更新状态。
+        """
+        iq = np.asarray(torques, dtype=np.float64) / kt
+        for bus, motor_ids, index, motors in self._plan(tuple(names)):
+            observing = any(motor.observe for motor in motors)
+            start = time.perf_counter()
+            replies = bus.transact_burst(encode_torque_batch(motor_ids, iq[index]), 0xA1, motor_ids,
+                                         13 if observing else 0)
+            self._apply_burst_replies(motors, replies, 0xA1, time.perf_counter() - start)
+
+    @staticmethod
+    def _apply_burst_replies(motors, replies: dict, cmd: int, latency: float):
+        """
+        连发闭环命令（批量扭矩、TrajectoryStreamer 的轨迹帧）之后：清除各电机的变化抑制记录，
+        观测模式电机按应答更新状态并记录遥测
+        """
+        for motor in motors:
+            motor.forget_setpoint()  # 绕过了单电机的变化抑制，之后的设定值必须重新下发
+            resp = replies.get(motor.motor_id)
+            if resp is not None and motor.observe:
+                motor.apply_status2_reply(resp)
+                motor.record(cmd, latency)
+
+    def attach_param_cache(self, cache):
+        """为组内所有电机启用同一个 ParamCache"""
         for motor in self.motors.values():
-            motor.refresh()
+            motor.param_cache = cache
+
+    def read_device_info_all(self) -> dict:
+        """读取所有电机的设备信息 {电机名称: dict}；启用缓存时命中的电机不访问总线"""
+        return {name: motor.read_device_info() for name, motor in self.motors.items()}
 
     def enable_all(self):
         for motor in self.motors.values():
@@ -0,0 +1,77 @@
+import time
+from motor.stats import LatencyHistogram
+
+
+class LoopRunner:
+    """
+    固定频率控制循环：按绝对 perf_counter 截止时间调度，避免 sleep 误差累积。
+    - 距截止时间较远时 sleep，最后 spin_time 秒忙等，兼顾 CPU 占用与抖动
+    - 单步超过周期记为 overrun，并跳过已错过的截止时间，不做补偿性连发
+    - 运行中可随时调用 stats() 查询实际频率、周期抖动与单步耗时（p50 / p99 / max）
+    """
+    def __init__(self, step, rate_hz: float, spin_time: float = 0.0005):
+        self.step = step
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.spin_time = spin_time
+        self.jitter = LatencyHistogram()        # |实际周期 - 目标周期|
+        self.step_latency = LatencyHistogram()  # step() 耗时
+        self.ticks = 0
+        self.overruns = 0
+        self._running = False
+        self._start = None
+        self._last_tick = None
+
+    def stop(self):
+        """请求停止（可在 step 内或其他线程调用）"""
+        self._running = False
+
+    def _wait_until(self, deadline: float):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_time:
+            time.sleep(remaining - self.spin_time)
+        while time.perf_counter() < deadline:
+            pass
+
+    def run(self, duration: float = None, max_ticks: int = None):
+        """
+        运行循环直到 stop()、达到 duration 秒或 max_ticks 次
+        """
+        self._running = True
+        self._start = time.perf_counter()
+        self._last_tick = None
+        deadline = self._start
+        while self._running:
+            tick = time.perf_counter()
+            if self._last_tick is not None:
+                self.jitter.record(abs(tick - self._last_tick - self.period))
+            self._last_tick = tick
+
+            self.step()
+            done = time.perf_counter()
+            self.step_latency.record(done - tick)
+            self.ticks += 1
+
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            if duration is not None and done - self._start >= duration:
+                break
+
+            deadline += self.period
+            if done > deadline:
+                self.overruns += 1
+                missed = int((done - deadline) / self.period) + 1
+                deadline += missed * self.period
+            self._wait_until(deadline)
+        self._running = False
+
+    def stats(self) -> dict:
+        elapsed = (self._last_tick - self._start) if self._last_tick is not None else 0.0
+        return {
+            "target_hz": self.rate_hz,
+            "achieved_hz": (self.ticks - 1) / elapsed if elapsed > 0 else 0.0,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "period_jitter": self.jitter.summary(),
+            "step_latency": self.step_latency.summary(),
+        }
@@ -1,6 +1,8 @@
-import serial
 import time
 from motor.protocol import *
+from motor.bus import LkBus
+from motor.policy import AdaptiveTimeout
+from motor.state import MotorState, EncoderTracker, ANGLE_RAW_TO_RAD
 
 
 class LkMotor:
@@ -8,156 +10,307 @@ class LkMotor:
     用于控制瓴控电机的串口控制类，封装了所有典型控制命令。
     支持：开环、闭环扭矩、速度、多圈位置、单圈位置、增量控制等。
     """
-    def __init__(self, port: str, baudrate: int = 460800, motor_id: int = 1):
+    def __init__(self, port: str = None, baudrate: int = 460800, motor_id: int = 1, observe: bool = False,
+                 bus: LkBus = None, recorder=None, policy: AdaptiveTimeout = None, param_cache=None,
+                 keepalive: float = None, backend: str = "pyserial"):
         """
         初始化串口连接和电机 ID。
+        - observe: 命令即观测模式，闭环控制命令（0xA1~0xA8）读取驱动应答并据此更新状态，
+          控制循环每个电机每拍只需一次写 + 一次读
+        - port: 串口设备名、传输地址（"tcp://host:port"、"udp://..."、"replay://..."）或传输对象，
+          见 motor.transport
+        - bus: 共享的总线对象；同一串口上的多个电机应传入同一个 LkBus，未指定时独占 port
+        - recorder: 可选的 TelemetryRecorder，每条带应答的命令记录一次状态与往返耗时
+        - policy: 可选的应答超时与重试策略，如 AdaptiveTimeout 按本电机实测耗时自适应；
+          默认（None 或 False）使用总线的固定超时且不重试。控制循环中宜用 AdaptiveTimeout.for_period(周期)
+          把单次查询的最坏耗时限制在周期预算内
+        - param_cache: 可选的 ParamCache，缓存设备信息与参数读取结果
+        - keepalive: 设定值变化抑制。指定时，与上一次成功发送的帧完全相同（量化后的负载相同）的
+          闭环/MIT 命令在 keepalive 秒内不再发送；None 表示每次都发送。观测模式下不抑制
+        - backend: 独占 port 时的串口后端，"pyserial" 或 "posix"（termios 低延迟，见 motor.posix_serial）
         """
         self.motor_id = motor_id
-        self.ser = serial.Serial(port=port, baudrate=baudrate, timeout=0.02)
-        if not self.ser.is_open:
-            self.ser.open()
-        self.position = None  # 多圈角度，单位弧度
-        self.velocity = None  # 速度，单位 弧度/s
-        self.torque = None    # 当前 Iq 电流，近似力矩
-
-    def send_command(self, cmd: int, data: list[int] = [], expect_reply_len: int = 0) -> bytes:
+        self.bus = bus if bus is not None else LkBus(port, baudrate, backend=backend)
+        self.ser = self.bus.ser
+        self.state = MotorState()  # 原地更新的状态记录，position / velocity / torque 由其换算
+        self.observe = observe
+        self.snapshot = None  # 后台轮询模式下发布的最新 MotorSnapshot
+        self._templates = {}  # (命令, 负载布局) → 预分配的 FrameTemplate
+        self.recorder = recorder
+        self.policy = policy or None
+        self.param_cache = param_cache
+        self.keepalive = keepalive
+        self.suppressed = 0  # 因设定值未变而省去的帧数
+        self._last_setpoint = None  # (上次成功发送的闭环命令帧, 发送时刻)
+
+    def send_command(self, cmd: int, data: list[int] = [], expect_reply_len: int = 0,
+                     timeout: float = None) -> bytes:
         """
         构造、发送一条指令并读取应答，包含头部/数据段校验。
+        - timeout: 本次等待应答的时间（秒），默认使用总线超时
+        """
+        self.forget_setpoint()  # 启停、清错等命令会改变驱动状态，之后的设定值必须重新下发
+        return self.send_frame(build_frame(cmd, self.motor_id, data), expect_reply_len, timeout)
+
+    def query(self, cmd: int, data: list[int], expect_reply_len: int, decode, timeout: float = None):
+        """
+        发送一条命令并以 decode(应答帧) 解析结果。
+        """
+        return self.query_frame(build_frame(cmd, self.motor_id, data), expect_reply_len, decode, timeout)
+
+    def send_frame(self, frame, expect_reply_len: int = 0, timeout: float = None) -> bytes:
+        """发送一条已编码好的帧（bytes 或 FrameTemplate 缓冲区）并读取应答"""
+        return self.bus.transact(frame, expect_reply_len, timeout)
+
+    def query_frame(self, frame, expect_reply_len: int, decode, timeout: float = None):
+        """
+        发送已编码好的帧并以 decode(应答帧) 解析结果。
+        各读取/控制方法都经由 send_frame / query_frame 完成 I/O，异步子类只需重写这两个方法。
+        """
+        if expect_reply_len > 0 and timeout is None and self.policy is not None:
+            return self._query_adaptive(frame, expect_reply_len, decode)
+        if self.recorder is None:
+            return decode(self.send_frame(frame, expect_reply_len, timeout))
+        start = time.perf_counter()
+        result = decode(self.send_frame(frame, expect_reply_len, timeout))
+        self.record(frame[1], time.perf_counter() - start)
+        return result
+
+    def _query_adaptive(self, frame, expect_reply_len: int, decode):
+        """
+        按 self.policy 的自适应超时等待应答；超时后在次数与时间预算内重发（增量位置命令除外），
+        最终失败时把状态标记为过期并抛出 MotorTimeoutError。
+        """
+        policy = self.policy
+        cmd = frame[1]
+        wire = self.bus.wire_time(len(frame) + expect_reply_len)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            sent = time.perf_counter()
+            try:
+                resp = self.send_frame(frame, expect_reply_len, policy.timeout)
+                break
+            except MotorTimeoutError:
+                policy.on_timeout()
+                now = time.perf_counter()
+                if cmd in NON_IDEMPOTENT_COMMANDS or not policy.can_retry(attempt, now - start,
+                                                                          policy.timeout + wire):
+                    self.state.mark_stale()
+                    raise
+                attempt += 1
+                self.bus.stats.get(self.motor_id, cmd).retries += 1
+        latency = time.perf_counter() - sent
+        policy.observe(max(latency - wire, 0.0))
+        result = decode(resp)
+        self.record(cmd, latency)
+        return result
+
+    def record(self, cmd: int, latency: float = 0.0):
+        """向遥测记录器追加一条当前状态记录（未设置记录器时忽略）"""
+        if self.recorder is not None:
+            self.recorder.record(self.motor_id, cmd, self.state, latency)
+
+    def stats(self) -> dict:
+        """本电机按命令分类的收发统计 {"0x9c": {requests, replies, timeouts, ..., latency}}"""
+        return self.bus.stats.snapshot(self.motor_id).get(self.motor_id, {})
+
+    def template(self, cmd: int, packer: struct.Struct) -> FrameTemplate:
+        """取得本电机某命令的预分配帧模板（首次使用时创建）"""
+        key = (cmd, packer)
+        tpl = self._templates.get(key)
+        if tpl is None:
+            tpl = self._templates[key] = FrameTemplate(cmd, self.motor_id, packer)
+        return tpl
+
+    def send_raw_command(self, cmd: int, data: list[int]):
         """
-        self.ser.reset_input_buffer()
-        frame = build_frame(cmd, self.motor_id, data)
-        self.ser.write(frame)
-        # time.sleep(0.005)
+        发送快速控制命令（如 MIT 控制）；非观测模式下不读取回应
+        """
+        return self._send_raw_frame(build_frame(cmd, self.motor_id, data))
 
-        if expect_reply_len > 0:
-            resp = self.ser.read(expect_reply_len)
+    def _send_raw_frame(self, frame):
+        try:
+            return self._send_closed_loop_frame(frame)
+        except Exception as e:
+            print(f"[Motor ID {self.motor_id}] 快速命令失败: {e}")
 
-            if len(resp) != expect_reply_len:
-                raise MotorTimeoutError("Timeout or incomplete response")
+    def send_closed_loop(self, cmd: int, data: list[int]):
+        """
+        发送闭环控制命令（0xA1~0xA8）。
+        观测模式下读取 13 字节应答（格式同状态2），更新 velocity / torque / temperature，
+        并返回本电机的 MotorState（原地更新，需要保留时请自行复制）；否则不等待应答，返回 None。
+        """
+        return self._send_closed_loop_frame(build_frame(cmd, self.motor_id, data))
 
-            if resp[0] != 0x3E:
-                raise InvalidHeaderError("Invalid frame header")
+    def _send_closed_loop_frame(self, frame, coalesce: bool = True):
+        """
+        发送闭环命令帧；启用 keepalive 且 coalesce 时，与上次成功发送相同的帧被省去（返回 None）
+        """
+        if coalesce and self.setpoint_unchanged(frame):
+            self.suppressed += 1
+            return None
+        if not self.observe:
+            result = self.query_frame(frame, 0, self._ignore_reply)
+        else:
+            result = self.query_frame(frame, 13, self.apply_status2_reply)
+        if coalesce:
+            self.setpoint_sent(frame)
+        return result
 
-            if not verify_checksum(resp[5:]):
-                raise ChecksumError("Invalid data checksum")
+    def setpoint_unchanged(self, frame) -> bool:
+        """
+        frame 与上次成功发送的设定值相同且未到 keepalive 重发时间；
+        观测模式下每条命令的应答就是状态反馈，不做抑制
+        """
+        last = self._last_setpoint
+        return (self.keepalive is not None and not self.observe and last is not None and last[0] == frame
+                and time.perf_counter() - last[1] < self.keepalive)
 
-            return resp
-        return b''
-    def send_raw_command(self, cmd: int, data: list[int]):
+    def setpoint_sent(self, frame):
+        """记录一条已成功发送的设定值帧（供变化抑制比较）"""
+        if self.keepalive is not None:
+            self._last_setpoint = (bytes(frame), time.perf_counter())
+
+    def forget_setpoint(self):
+        """清除变化抑制记录，下一条设定值必定发送；绕过本电机直接下发命令（如 MotorGroup 批量扭矩）后调用"""
+        self._last_setpoint = None
+
+    def _send_packed(self, cmd: int, packer: struct.Struct, *values, coalesce: bool = True):
+        """以预分配模板原地打包负载并发送闭环命令，不产生中间列表/bytes"""
+        return self._send_closed_loop_frame(self.template(cmd, packer).pack(*values), coalesce)
+
+    @staticmethod
+    def _ignore_reply(resp):
+        return None
+
+    def apply_status2_reply(self, resp: bytes) -> MotorState:
         """
-        发送不需要读取回应的快速控制命令（如 MIT 控制）
+        以状态2格式的应答帧（0x9C 或闭环命令应答）更新速度、力矩、温度与编码器值；
+        MotorGroup 等在本电机之外收到应答时也经此更新状态
         """
-        try:
-            self.send_command(cmd=cmd, data=data, expect_reply_len=0)
-        except Exception as e:
-            print(f"[Motor ID {self.motor_id}] 快速命令失败: {e}")
+        return self.state.update_status2(resp)
+
+    def _on_multi_turn_reply(self, resp: bytes) -> MotorState:
+        """以 0x92 应答帧更新多圈位置"""
+        return self.state.update_multi_turn(resp)
+
+    @property
+    def position(self):
+        """多圈角度，单位弧度"""
+        return self.state.position
+
+    @property
+    def velocity(self):
+        """速度，单位 弧度/s"""
+        return self.state.velocity
+
+    @property
+    def torque(self):
+        """当前 Iq 电流换算的近似力矩，单位 Nm"""
+        return self.state.torque
+
+    @property
+    def temperature(self):
+        """电机温度，单位 ℃"""
+        return self.state.temperature
+
+    @property
+    def encoder_value(self):
+        """最近一次应答中的编码器值（单圈）"""
+        return self.state.encoder_value
 
     def enable(self):
         """命令 0x88：启动电机"""
-        self.send_command(0x88)
+        return self.send_command(0x88)
 
     def disable(self):
         """命令 0x80：关闭电机"""
-        self.send_command(0x80)
+        return self.send_command(0x80)
 
     def stop(self):
         """命令 0x81：立即停止电机（停止控制输出）"""
-        self.send_command(0x81)
+        return self.send_command(0x81)
 
     def clear_error(self):
         """命令 0x9B：清除错误位"""
-        self.send_command(0x9B)
+        return self.send_command(0x9B)
 
     def set_zero_ram(self):
         """命令 0x19：设置当前位置为零点（断电失效）"""
-        self.send_command(0x19)
+        return self.send_command(0x19)
 
     def set_zero_rom(self):
         """命令 0x19：持久化零点（部分版本支持 ROM）"""
-        self.send_command(0x19)
+        return self.send_command(0x19)
 
     def clear_turn_count(self):
         """命令 0x93：清除圈数信息（恢复为单圈）"""
-        self.send_command(0x93)
+        return self.send_command(0x93)
 
     def read_status_1(self):
         """命令 0x9A：读取状态1（温度、电压、运行状态等）"""
-        resp = self.send_command(0x9A, [], expect_reply_len=13)
-        return parse_status1(resp[5:])
+        return self.query(0x9A, [], 13, lambda resp: parse_status1(resp, 5))
 
     def read_status_2(self):
         """命令 0x9C：读取状态2（Iq、电流、速度、编码器）"""
-        resp = self.send_command(0x9C, [], expect_reply_len=13)
-        return parse_status2(resp[5:])
+        return self.query(0x9C, [], 13, lambda resp: parse_status2(resp, 5))
 
     def read_encoder(self):
         """命令 0x90：读取编码器值、原始编码值与偏移"""
-        resp = self.send_command(0x90, [], expect_reply_len=12)
-        return parse_encoder(resp[5:])
+        return self.query(0x90, [], 12, lambda resp: parse_encoder(resp, 5))
 
     def read_multi_turn_angle(self):
-        resp = self.send_command(0x92, [], expect_reply_len=14)
-        motor_angle_deg = parse_angle64(resp[5:13]) / 10.0
-        radian = degree_to_radian(motor_angle_deg)
-        # print(f"[Motor ID {self.motor_id}] 多圈角度解析: {motor_angle_deg:+.2f}°")
-        return radian
+        return self.query(0x92, [], 14, self._multi_turn_to_radian)
+
+    @staticmethod
+    def _multi_turn_to_radian(resp: bytes) -> float:
+        """将 0x92 应答帧换算为多圈角度（弧度）"""
+        return ANGLE64_STRUCT.unpack_from(resp, 5)[0] * ANGLE_RAW_TO_RAD
 
     def read_single_turn_angle(self):
         """命令 0x94：读取单圈角度（单位：0.01°，4字节）"""
-        resp = self.send_command(0x94, [], expect_reply_len=10)
         # 单圈是 4 字节，单位 0.01°
-        circle_angle_raw = int.from_bytes(resp[5:9], byteorder='little', signed=False)
-        circle_angle_deg = circle_angle_raw / 100.0
-        return circle_angle_deg
+        return self.query(0x94, [], 10, lambda resp: parse_circle_angle(resp[5:9]))
 
     def set_open_loop(self, power: int):
         """
         命令 0xA0：开环控制，输入功率值（-850~850）
         """
-        bytes_ = list(power.to_bytes(2, 'little', signed=True))
-        self.send_command(0xA0, bytes_)
+        self.forget_setpoint()  # 切换到开环后，之后的闭环设定值必须重新下发
+        return self.send_frame(self.template(0xA0, PACK_I16).pack(power))
 
     def set_torque(self, iq: float):
         """
         命令 0xA1：扭矩环控制，输入目标电流Iq（单位：A）
         """
         try:
-            iq_scaled = iq * (2048 / 33.0)
-            iq_int = int(round(iq_scaled))
-            iq_int = max(-2048, min(2047, iq_int))
-            bytes_ = list(iq_int.to_bytes(2, 'little', signed=True))
-            self.send_command(0xA1, bytes_)
+            return self._send_packed(0xA1, PACK_I16, iq_to_int(iq))
         except Exception as e:
-            print("发送扭矩失败")
+            print(f"[Motor ID {self.motor_id}] 发送扭矩失败: {e}")
 
     def set_torque_nm(self, torque: float, kt: float = 0.09):
         iq = torque / kt
-        self.set_torque(iq)
+        return self.set_torque(iq)
 
 
     def set_speed(self, speed_dps: float):
         """
         命令 0xA2：速度环控制，单位 deg/s，内部以 0.01°/s 表示
         """
-        val = int(speed_dps * 1000)
-        bytes_ = list(val.to_bytes(4, 'little', signed=True))
-        self.send_command(0xA2, bytes_)
+        return self._send_packed(0xA2, PACK_I32, int(speed_dps * 1000))
 
     def move_to_position(self, angle_deg: float):
         """
         命令 0xA3：位置环控制（多圈），单位为 0.01°
         """
-        val = int(angle_deg * 100)
-        bytes_ = list(val.to_bytes(8, 'little', signed=True))
-        self.send_command(0xA3, bytes_)
+        return self._send_packed(0xA3, PACK_I64, int(angle_deg * 100))
 
     def move_to_position_with_speed(self, angle_deg: float, speed_dps: float):
         """
         命令 0xA4：位置+速度环控制（多圈）
         """
-        a = int(angle_deg * 100).to_bytes(8, 'little', signed=True)
-        s = int(speed_dps * 100).to_bytes(4, 'little')
-        self.send_command(0xA4, list(a + s))
+        return self._send_packed(0xA4, PACK_I64_U32, int(angle_deg * 100), int(speed_dps * 100))
 
     def move_single_circle(self, angle_deg: float, clockwise: bool):
         """
@@ -165,33 +318,28 @@ class LkMotor:
         - clockwise: True=顺时针, False=逆时针
         """
         direction = 0x00 if clockwise else 0x01
-        val = int(angle_deg * 100)
-        a = list(val.to_bytes(2, 'little'))
-        self.send_command(0xA5, [direction] + a + [0x00])
+        return self._send_packed(0xA5, PACK_CIRCLE, direction, int(angle_deg * 100), 0x00)
 
     def move_single_circle_with_speed(self, angle_deg: float, clockwise: bool, speed_dps: float):
         """
         命令 0xA6：单圈位置+速度控制
         """
         direction = 0x00 if clockwise else 0x01
-        a = int(angle_deg * 100).to_bytes(2, 'little')
-        s = int(speed_dps * 100).to_bytes(4, 'little')
-        self.send_command(0xA6, [direction] + list(a) + [0x00] + list(s))
+        return self._send_packed(0xA6, PACK_CIRCLE_SPEED, direction, int(angle_deg * 100), 0x00,
+                                 int(speed_dps * 100))
 
     def move_incremental(self, angle_delta_deg: float):
         """
         命令 0xA7：增量移动（相对位移，单位 0.01°）
         """
-        val = int(angle_delta_deg * 100)
-        self.send_command(0xA7, list(val.to_bytes(4, 'little', signed=True)))
+        return self._send_packed(0xA7, PACK_I32, int(angle_delta_deg * 100), coalesce=False)
 
     def move_incremental_with_speed(self, angle_delta_deg: float, speed_dps: float):
         """
         命令 0xA8：增量移动 + 速度控制
         """
-        a = int(angle_delta_deg * 100).to_bytes(4, 'little', signed=True)
-        s = int(speed_dps * 100).to_bytes(4, 'little')
-        self.send_command(0xA8, list(a + s))
+        return self._send_packed(0xA8, PACK_I32_U32, int(angle_delta_deg * 100), int(speed_dps * 100),
+                                 coalesce=False)
 
     def read_param(self, param_id: int):
         """
@@ -199,8 +347,21 @@ class LkMotor:
         - 返回值为 6 字节参数体（根据 ID 解释）
         """
         data = [param_id, 0x00]
-        resp = self.send_command(0x40, data, expect_reply_len=13)
-        return resp[6:-1]
+        cache = self.param_cache
+        if cache is None:
+            return self.query(0x40, data, 13, lambda resp: resp[6:-1])
+        key = self.cache_key
+        if cache.needs_verify(key):
+            self.read_device_info()  # 一次 0x12 往返核对固件版本，通过后参数即可由缓存提供
+        cached = cache.param(key, param_id)
+        if cached is not None:
+            return self._immediate(cached)
+
+        def decode(resp):
+            value = resp[6:-1]
+            cache.store_param(key, param_id, value)
+            return value
+        return self.query(0x40, data, 13, decode)
 
     def write_param_ram(self, param_id: int, param_data: list[int]):
         """
@@ -208,7 +369,9 @@ class LkMotor:
         """
         assert len(param_data) == 6
         data = [param_id] + param_data
-        self.send_command(0x42, data)
+        if self.param_cache is not None:
+            self.param_cache.invalidate_param(self.cache_key, param_id, ram=True)
+        return self.send_command(0x42, data)
 
     def write_param_rom(self, param_id: int, param_data: list[int]):
         """
@@ -216,7 +379,19 @@ class LkMotor:
         """
         assert len(param_data) == 6
         data = [param_id] + param_data
-        self.send_command(0x44, data)
+        if self.param_cache is not None:
+            self.param_cache.invalidate_param(self.cache_key, param_id)
+        return self.send_command(0x44, data)
+
+    @property
+    def cache_key(self) -> str:
+        """参数缓存中本电机的条目键（串口 + 电机 ID）"""
+        return f"{self.bus.port}#{self.motor_id}"
+
+    @staticmethod
+    def _immediate(value):
+        """不经总线直接得到的结果（缓存命中）；异步子类包装为可 await 的对象"""
+        return value
 
     def getPosition(self):
         return self.position
@@ -232,57 +407,59 @@ class LkMotor:
         刷新当前电机状态，更新 self.position / velocity / torque。
         使用单圈角度（单位：°）
         """
-        try:
-            self.position = self.read_multi_turn_angle()
-            # time.sleep(0.01)
-        except Exception as e:
-            print(f"[Motor ID {self.motor_id}] 读取位置失败: {e} --------------------------------")
-
-        time.sleep(0.002)
+        ok = True
+        if self.state.needs_multi_turn():
+            try:
+                self.query(0x92, [], 14, self._on_multi_turn_reply)
+                # time.sleep(0.01)
+            except Exception as e:
+                ok = False
+                print(f"[Motor ID {self.motor_id}] 读取位置失败: {e} --------------------------------")
 
         try:
-            status = self.read_status_2()
-            # print("***********************************************************************")
-            # print(status)
-            vel_deg_per_sec = status.get("speed_dps", 0.0) / 10.0
-            self.velocity = degree_to_radian(vel_deg_per_sec)
-            iq_control = status.get("iq_or_power", 0.0)
-            # print(f"IQ_Control={iq_control:+.2f} ")
-            iq = iq_control / 2048.00 * 33.0
-            # print(f"iq={iq:+.2f}")
-            KT = 0.09
-            self.torque = iq * KT * 10
+            self.query(0x9C, [], 13, self.apply_status2_reply)
         except Exception as e:
-            print("[Motor ID {self.motor_id}] 读取速度失败: {e} -------------------------------")
+            ok = False
+            print(f"[Motor ID {self.motor_id}] 读取速度失败: {e} -------------------------------")
+        if not ok:
+            self.state.mark_stale()  # 任一半未更新，都不应把整份状态当作最新
+
+    def track_position(self, resync_period: float = 1.0, velocity: str = "driver",
+                       alpha: float = 0.2) -> EncoderTracker:
+        """
+        启用软件多圈展开：位置由状态2应答中的编码器值推算，refresh() 只在建立基准和
+        每 resync_period 秒校正时读取 0x92，其余时候每次只需一次 0x9C 往返；
+        观测模式下闭环命令的应答同样推进位置。velocity 见 EncoderTracker。
+        将 self.state.tracker 置为 None 即恢复每次读取 0x92。
+        """
+        self.state.tracker = EncoderTracker(resync_period, velocity, alpha)
+        return self.state.tracker
 
     def read_device_info(self) -> dict:
         """
         读取电机型号/驱动版本等设备信息（使用 0x12 命令）
         """
-        # 构造请求帧
-        header = [0x3E, 0x12, self.motor_id, 0x00]
-        checksum = sum(header) & 0xFF
-        frame = bytes(header + [checksum])
-        self.ser.write(frame)
-        time.sleep(0.05)
-
         # 期望返回：5字节帧头 + 58字节数据 + 1字节数据校验 = 64字节
-        resp = self.ser.read(64)
-        if len(resp) != 64:
-            raise IOError(f"响应长度错误，仅收到 {len(resp)} 字节")
-
-        if resp[0] != 0x3E or resp[1] != 0x12 or resp[2] != self.motor_id or resp[3] != 0x3A:
-            raise ValueError("帧头验证失败，非合法设备信息帧")
-
-        # 校验帧头
-        expected_header_checksum = sum(resp[0:4]) & 0xFF
-        if resp[4] != expected_header_checksum:
-            raise ValueError("帧头校验失败")
-
+        # 帧头与校验和由流式解析器验证，驱动准备设备信息较慢，放宽等待时间
+        cache = self.param_cache
+        if cache is None:
+            return self.query(0x12, [], 64, self._decode_device_info, timeout=0.1)
+        key = self.cache_key
+        if not cache.needs_verify(key):
+            cached = cache.device_info(key)
+            if cached is not None:
+                return self._immediate(dict(cached))
+
+        def decode(resp):
+            info = self._decode_device_info(resp)
+            cache.store_device_info(key, info)
+            return info
+        return self.query(0x12, [], 64, decode, timeout=0.1)
+
+    @staticmethod
+    def _decode_device_info(resp: bytes) -> dict:
+        """解析 0x12 设备信息应答帧"""
         data = resp[5:63]  # 正确：取 58 字节
-        data_checksum = sum(data) & 0xFF
-        if resp[63] != data_checksum:
-            raise ValueError("数据校验失败")
 
         def extract_string(segment: bytes) -> str:
             return segment.split(b'\x00')[0].decode('ascii', errors='ignore').strip()
@@ -307,37 +484,22 @@ class LkMotor:
             torque_offset  - 期望输出力矩（Nm）
         """
 
-        Q_MAX = 360.0
-        DQ_MAX = 2000.0 * 100
-        TAU_MAX = 33.0
-        IQ_MAX = 2048
+        buf = encode_mit_payload(q_desired, dq_desired, kp, kd, torque_offset)
+        return self._send_raw_frame(self.template(0xA8, PACK_MIT).pack(*buf))
 
-        q_uint = float_to_uint(q_desired, -Q_MAX, Q_MAX, 16)
-        dq_scaled = dq_desired * 100 
-        dq_uint = float_to_uint(dq_scaled, -DQ_MAX, DQ_MAX, 12)
-        kp_uint = float_to_uint(kp, 0, 500, 12)
-        kd_uint = float_to_uint(kd, 0, 5, 12)
+    def age(self, now: float = None) -> float:
+        """位置/速度中较旧一份测量距今的时间（秒）"""
+        return self.state.age(now)
 
-        KT = 1.1
-        iq = torque_offset / KT
-        iq = max(-33, min(33, iq))
-        tau_uint = float_to_uint(iq, -33.0, 33.0, 12)
-
-        buf = [0]*8
-        buf[0] = (q_uint >> 8) & 0xFF
-        buf[1] = q_uint & 0xFF
-        buf[2] = (dq_uint >> 4) & 0xFF
-        buf[3] = ((dq_uint & 0xF) << 4) | ((kp_uint >> 8) & 0xF)
-        buf[4] = kp_uint & 0xFF
-        buf[5] = (kd_uint >> 4) & 0xFF
-        buf[6] = ((kd_uint & 0xF) << 4) | ((tau_uint >> 8) & 0xF)
-        buf[7] = tau_uint & 0xFF
-
-        self.send_raw_command(cmd=0xA8, data=buf)
-
-    def is_valid(self):
+    def is_valid(self, max_age: float = None):
+        """
+        状态完整且最近一次查询未超时；
+        指定 max_age 时还要求最旧一份测量不早于 max_age 秒之前
+        """
         return (
+            self.state.stale_since is None and
             self.position is not None and
             self.velocity is not None and
-            self.torque is not None
+            self.torque is not None and
+            (max_age is None or self.state.age() <= max_age)
         )
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+多进程多总线控制：每条串口总线由一个独立的工作进程独占，运行 LkMotor 的 I/O 循环；
+主进程（控制器）与各工作进程通过 multiprocessing.shared_memory 交换状态与设定值，
+每块数据以 seqlock 保护：写者先把序号置为奇数、写入、再置为偶数，读者在序号为偶数且前后一致时才采用。
+总线之间不再共享一个 GIL，总控制频率随总线数与 CPU 核数扩展。
+
+    with MultiBusController({"/dev/ttyUSB0": {"m1": 1}, "/dev/ttyUSB1": {"m2": 2}}, rate_hz=1000) as ctrl:
+        s = ctrl.snapshot("m1")                  # MotorSnapshot 或 None
+        ctrl.submit("m2", "set_torque_nm", 0.1)  # 最新值覆盖未发送的旧值
+
+时间戳为 time.perf_counter()（Linux 上即系统级 CLOCK_MONOTONIC），可跨进程直接比较。
+"""
+import inspect
+import math
+import multiprocessing as mp
+import struct
+from multiprocessing import shared_memory
+from motor.background import MotorSnapshot
+
+SEQ = struct.Struct('<Q')
+# 状态块：位置 | 速度 | 力矩 | 温度 | 采集时刻 | 测量序号
+STATE_STRUCT = struct.Struct('<5dQ')
+# 设定值块：代次 | 方法编号 | 参数 ×5
+SETPOINT_STRUCT = struct.Struct('<QB7x5d')
+# 每条总线的工作进程计数：轮数 | 超时轮数
+WORKER_STRUCT = struct.Struct('<QQ')
+
+STATE_SIZE = SEQ.size + STATE_STRUCT.size
+SETPOINT_SIZE = SEQ.size + SETPOINT_STRUCT.size
+SLOT_SIZE = STATE_SIZE + SETPOINT_SIZE
+
+# 可经共享内存下发的设定值方法（参数均为数值）；编号即下标 + 1
+SETPOINT_METHODS = (
+    "set_open_loop",
+    "set_torque",
+    "set_torque_nm",
+    "set_speed",
+    "move_to_position",
+    "move_to_position_with_speed",
+    "apply_mit_control",
+)
+_NAN = float('nan')
+
+
+# seqlock 读在序号为奇数或前后不一致时重读的次数上限；写者正常写入只需微秒级，
+# 超过上限说明写者在更新中途退出，继续自旋只会卡死读者
+SEQ_READ_RETRIES = 1 << 20
+
+
+def _method_params(name: str):
+    """方法的 (参数名, 默认值) 列表，去掉 self"""
+    from motor.motor import LkMotor
+    params = list(inspect.signature(getattr(LkMotor, name)).parameters.values())[1:]
+    return [(p.name, p.default) for p in params]
+
+
+def _method_converters(name: str):
+    """共享内存中参数均以 double 存放；按注解把 int 参数（如开环功率）还原为整数"""
+    from motor.motor import LkMotor
+    params = list(inspect.signature(getattr(LkMotor, name)).parameters.values())[1:]
+    return [round if p.annotation is int else float for p in params]
+
+
+def seq_write(buf, offset: int, packer: struct.Struct, *values):
+    """seqlock 写：仅允许单一写者"""
+    seq = SEQ.unpack_from(buf, offset)[0] + 1
+    SEQ.pack_into(buf, offset, seq)
+    packer.pack_into(buf, offset + SEQ.size, *values)
+    SEQ.pack_into(buf, offset, seq + 1)
+
+
+def seq_read(buf, offset: int, packer: struct.Struct):
+    """
+    seqlock 读：返回 (序号, 数据)，写入进行中或读到撕裂数据时重读；
+    重读 SEQ_READ_RETRIES 次仍未成功时抛出 RuntimeError
+    """
+    for _ in range(SEQ_READ_RETRIES):
+        seq = SEQ.unpack_from(buf, offset)[0]
+        if seq & 1:
+            continue
+        values = packer.unpack_from(buf, offset + SEQ.size)
+        if SEQ.unpack_from(buf, offset)[0] == seq:
+            return seq, values
+    raise RuntimeError(f"seqlock 读取失败（偏移 {offset}）：写者可能在更新中途退出")
+
+
+def _bus_worker(shm_name: str, port: str, baudrate: int, motors: list, worker_offset: int,
+                rate_hz: float, observe: bool, stop_event):
+    """
+    工作进程主循环：下发新的设定值 → 流水线刷新本总线所有电机 → 发布状态。
+    - motors: [(槽位下标, 电机 ID)]
+    """
+    from motor.bus import LkBus
+    from motor.motor import LkMotor
+    from motor.group import MotorGroup
+    from motor.loop import LoopRunner
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf
+    bus = LkBus(port, baudrate)
+    group = MotorGroup()
+    slots = []
+    for slot, motor_id in motors:
+        motor = LkMotor(bus=bus, motor_id=motor_id, observe=observe)
+        group.add_motor(str(slot), motor)
+        slots.append((slot * SLOT_SIZE, motor, [0]))
+    methods = [getattr(LkMotor, name) for name in SETPOINT_METHODS]
+    converters = [_method_converters(name) for name in SETPOINT_METHODS]
+
+    def step():
+        if stop_event.is_set():
+            runner.stop()
+            return
+        for offset, motor, last in slots:
+            _, (generation, code, *args) = seq_read(buf, offset + STATE_SIZE, SETPOINT_STRUCT)
+            if generation != last[0] and code:
+                last[0] = generation
+                try:
+                    methods[code - 1](motor, *[convert(a) for convert, a in zip(converters[code - 1], args)])
+                except Exception as e:
+                    print(f"[Motor ID {motor.motor_id}] 设定值 {SETPOINT_METHODS[code - 1]} 失败: {e}")
+        group.refresh_all()
+        for offset, motor, _ in slots:
+            if motor.is_valid():
+                state = motor.state
+                seq_write(buf, offset, STATE_STRUCT, motor.position, motor.velocity, motor.torque,
+                          _NAN if state.temperature is None else state.temperature, state.stamp, state.seq)
+        WORKER_STRUCT.pack_into(buf, worker_offset, runner.ticks + 1, runner.overruns)
+
+    runner = LoopRunner(step, rate_hz)
+    try:
+        runner.run()
+    finally:
+        bus.close()
+        del buf
+        shm.close()
+
+
+class MultiBusController:
+    """
+    主进程侧：为每条总线启动一个工作进程，并提供按电机名称的状态读取与设定值下发。
+    - buses: {串口: {电机名称: 电机 ID}}
+    - rate_hz: 每个工作进程的轮询频率
+    - observe: 工作进程中的电机是否使用命令即观测模式
+    submit() 只能由主进程中的单个线程调用（每个设定值块仅允许一个写者）。
+    """
+    def __init__(self, buses: dict, baudrate: int = 460800, rate_hz: float = 1000.0, observe: bool = False):
+        self.buses = buses
+        self.baudrate = baudrate
+        self.rate_hz = rate_hz
+        self.observe = observe
+        self._slots = {}  # 名称 → 槽位下标
+        for motors in buses.values():
+            for name in motors:
+                if name in self._slots:
+                    raise ValueError(f"电机名称重复: {name}")
+                self._slots[name] = len(self._slots)
+        self._worker_base = len(self._slots) * SLOT_SIZE
+        self._generation = [0] * len(self._slots)
+        self._params = {name: _method_params(name) for name in SETPOINT_METHODS}
+        self.shm = None
+        self.processes = []
+        self._stop = None
+
+    def start(self):
+        if self.shm is not None:
+            return self
+        size = self._worker_base + len(self.buses) * WORKER_STRUCT.size
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.shm.buf[:size] = bytes(size)
+        self._stop = mp.Event()
+        for index, (port, motors) in enumerate(self.buses.items()):
+            slot_ids = [(self._slots[name], motor_id) for name, motor_id in motors.items()]
+            proc = mp.Process(target=_bus_worker, name=f"lk-bus-{index}", daemon=True,
+                              args=(self.shm.name, port, self.baudrate, slot_ids,
+                                    self._worker_base + index * WORKER_STRUCT.size,
+                                    self.rate_hz, self.observe, self._stop))
+            proc.start()
+            self.processes.append(proc)
+        return self
+
+    def stop(self):
+        if self.shm is None:
+            return
+        self._stop.set()
+        for proc in self.processes:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+        self.processes = []
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def snapshot(self, name: str):
+        """读取电机最新状态为 MotorSnapshot；工作进程尚未发布过有效状态时返回 None"""
+        seq, (position, velocity, torque, temperature, stamp, count) = seq_read(
+            self.shm.buf, self._slots[name] * SLOT_SIZE, STATE_STRUCT)
+        if seq == 0:
+            return None
+        return MotorSnapshot(position, velocity, torque,
+                             None if math.isnan(temperature) else int(temperature), count, stamp)
+
+    def submit(self, name: str, method: str, *args, **kwargs):
+        """
+        排队一条设定值命令，例如 submit("m1", "apply_mit_control", q, dq, kp=2.0, kd=0.05)。
+        工作进程在下一轮发送；未发送的旧值被覆盖。
+        """
+        params = self._params.get(method)
+        if params is None:
+            raise ValueError(f"不支持经共享内存下发的方法: {method}")
+        if len(args) > len(params):
+            raise TypeError(f"{method} 参数过多")
+        values = list(args)
+        for param, default in params[len(args):]:
+            if param in kwargs:
+                values.append(kwargs.pop(param))
+            elif default is not inspect.Parameter.empty:
+                values.append(default)
+            else:
+                raise TypeError(f"{method} 缺少参数 {param}")
+        if kwargs:
+            raise TypeError(f"{method} 不接受参数 {', '.join(kwargs)}")
+        values += [0.0] * (5 - len(values))
+        slot = self._slots[name]
+        self._generation[slot] += 1
+        seq_write(self.shm.buf, slot * SLOT_SIZE + STATE_SIZE, SETPOINT_STRUCT,
+                  self._generation[slot], SETPOINT_METHODS.index(method) + 1, *values)
+
+    def worker_stats(self) -> dict:
+        """{串口: {"ticks": 轮数, "overruns": 超时轮数}}"""
+        result = {}
+        for index, port in enumerate(self.buses):
+            ticks, overruns = WORKER_STRUCT.unpack_from(self.shm.buf, self._worker_base + index * WORKER_STRUCT.size)
+            result[port] = {"ticks": ticks, "overruns": overruns}
+        return result
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+CACHE_VERSION = 1
+
+
+class ParamCache:
+    """
+    设备信息与参数的缓存，按（串口, 电机 ID）分条目，可持久化到一个小 JSON 文件：
+    - 缓存 read_device_info() 与 read_param() 的结果，命中时完全不访问总线
+    - write_param_ram() / write_param_rom() 使对应参数失效
+    - 每个条目记录固件版本；新读到的设备信息固件版本不一致时丢弃该电机的全部参数
+    - 只写入 RAM 的参数在本次运行中不再缓存：掉电后驱动恢复 ROM 值，RAM 值不能落盘
+    - verify: 为 True 时每个电机首次访问先读一次 0x12 核对固件版本（一次往返代替全部参数读取）；
+      为 False 时完全信任磁盘缓存
+    """
+    def __init__(self, path: str = None, verify: bool = False, autosave: bool = True):
+        self.path = path
+        self.verify = verify
+        self.autosave = autosave
+        self.entries = {}
+        self._verified = set()
+        self._ram = set()  # 本次运行中写过 RAM 的 (条目键, 参数 ID)
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def key(port: str, motor_id: int) -> str:
+        return f"{port}#{motor_id}"
+
+    def load(self):
+        """读取缓存文件；格式版本不符或文件损坏时从空缓存开始"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("motors", {})
+
+    def save(self):
+        """原子地写回缓存文件（先写临时文件再替换）"""
+        if self.path is None:
+            return
+        with self._lock:
+            text = json.dumps({"version": CACHE_VERSION, "motors": self.entries}, indent=2, ensure_ascii=False)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+
+    def _changed(self):
+        if self.autosave:
+            self.save()
+
+    def needs_verify(self, key: str) -> bool:
+        """该条目是否还需要在线核对固件版本"""
+        return self.verify and key in self.entries and key not in self._verified
+
+    def device_info(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry.get("device_info")
+
+    def store_device_info(self, key: str, info: dict):
+        """记录新读到的设备信息；固件版本变化时清空该电机的参数缓存"""
+        entry = self.entries.get(key)
+        firmware = info.get("firmware_version")
+        if entry is None or entry.get("firmware_version") != firmware:
+            entry = self.entries[key] = {"firmware_version": firmware, "params": {}}
+        entry["device_info"] = dict(info)
+        self._verified.add(key)
+        self._changed()
+
+    def param(self, key: str, param_id: int):
+        """缓存的 6 字节参数体（bytes），未缓存时返回 None"""
+        entry = self.entries.get(key)
+        if entry is None or (key, param_id) in self._ram:
+            return None
+        value = entry["params"].get(str(param_id))
+        return None if value is None else bytes.fromhex(value)
+
+    def store_param(self, key: str, param_id: int, value: bytes):
+        if (key, param_id) in self._ram:
+            return
+        entry = self.entries.setdefault(key, {"firmware_version": None, "params": {}})
+        entry["params"][str(param_id)] = bytes(value).hex()
+        self._changed()
+
+    def invalidate_param(self, key: str, param_id: int, ram: bool = False):
+        """
+        参数被改写后使其失效：
+        - ram=True（写 RAM）：本次运行中不再缓存该参数
+        - ram=False（写 ROM）：解除 RAM 标记，下次读取的值重新缓存
+        """
+        if ram:
+            self._ram.add((key, param_id))
+        else:
+            self._ram.discard((key, param_id))
+        entry = self.entries.get(key)
+        if entry is not None and entry["params"].pop(str(param_id), None) is not None:
+            self._changed()
+
+    def invalidate(self, key: str = None):
+        """清除一个电机（或全部）的缓存"""
+        if key is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key, None)
+        self._changed()
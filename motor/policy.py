@@ -0,0 +1,70 @@
+import math
+
+
+class AdaptiveTimeout:
+    """
+    按电机学习应答耗时的超时策略：
+    读应答的等待时间 = EWMA(均值) + k·σ，并限制在 [min_timeout, max_timeout] 内。
+    学习的是扣除线上传输时间后的"驱动处理 + 系统调度"耗时，总线会按帧长另行加上传输时间，
+    因此同一策略可用于不同应答长度的命令。
+    - alpha: EWMA 平滑系数
+    - k: 标准差倍数
+    - warmup: 样本数不足时使用 max_timeout
+    - retries: 超时后的最大重试次数；默认不重试，失联电机每次查询至多耗费一次等待
+    - budget: 单次查询（含重试）的总时间预算（秒），通常取控制周期的一部分；
+      同时作为单次等待时间的上限。None 表示只受 retries 与 max_timeout 限制
+    """
+    def __init__(self, alpha: float = 1 / 16, k: float = 4.0, min_timeout: float = 0.002,
+                 max_timeout: float = 0.02, warmup: int = 8, retries: int = 0, budget: float = None):
+        self.alpha = alpha
+        self.k = k
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.warmup = warmup
+        self.retries = retries
+        self.budget = budget
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+        self.consecutive_timeouts = 0
+
+    @property
+    def timeout(self) -> float:
+        """当前的等待时间（秒，不含线上传输时间），不超过 budget"""
+        if self.samples < self.warmup:
+            value = self.max_timeout
+        else:
+            value = (self.mean + self.k * math.sqrt(self.var)) * (1 << self.consecutive_timeouts)
+            value = min(self.max_timeout, max(self.min_timeout, value))
+        return value if self.budget is None else min(value, self.budget)
+
+    @classmethod
+    def for_period(cls, period: float, share: float = 0.5, **kwargs):
+        """按调用方的控制周期（秒）设定预算：单次查询（含重试）至多占用 share 个周期"""
+        return cls(budget=period * share, **kwargs)
+
+    def observe(self, latency: float):
+        """记录一次成功应答的耗时"""
+        self.consecutive_timeouts = 0
+        self.samples += 1
+        if self.samples == 1:
+            self.mean = latency
+            self.var = 0.0
+            return
+        diff = latency - self.mean
+        self.mean += self.alpha * diff
+        self.var = (1 - self.alpha) * (self.var + self.alpha * diff * diff)
+
+    def on_timeout(self):
+        """
+        超时后等待时间翻倍，直到下一次成功应答；偶发丢帧不会污染统计量，
+        而驱动耗时整体变长时也能逐步放宽到 max_timeout 并重新学习。
+        """
+        if self.consecutive_timeouts < 8:
+            self.consecutive_timeouts += 1
+
+    def can_retry(self, attempt: int, elapsed: float, next_wait: float) -> bool:
+        """第 attempt 次（从 0 计）失败后是否还能在预算内重试"""
+        if attempt >= self.retries:
+            return False
+        return self.budget is None or elapsed + next_wait <= self.budget
@@ -0,0 +1,202 @@
+"""
+基于 termios 的低延迟串口后端（仅 POSIX），接口为 LkBus 用到的 pyserial 子集：
+
+    motor = LkMotor("/dev/ttyUSB0", motor_id=1, backend="posix")
+    motor.bus.ser.rtt.summary()   # 写出请求到收到应答首段的耗时
+
+与 pyserial 默认设置相比：
+- 以非阻塞方式打开 tty，VTIME=0、VMIN 设为本次事务的应答总长（LkBus 发送请求前经 expect_reply() 告知，
+  与上次相同时不调用 tcsetattr），poll() 在整段应答到齐时才唤醒，每条应答只唤醒一次
+- 尽力开启驱动的低延迟模式：TIOCSSERIAL 的 ASYNC_LOW_LATENCY 标志，
+  以及 USB 转串口（如 FTDI）sysfs 下的 latency_timer（默认 16 ms，设为 1 ms）
+- 读取经 os.readv 把已到达的字节一次读入预分配缓冲区，read_view() 返回其切片，不逐次分配 bytes
+"""
+import errno
+import fcntl
+import os
+import select
+import struct
+import termios
+import time
+from motor.stats import LatencyHistogram
+
+TIOCGSERIAL = getattr(termios, "TIOCGSERIAL", 0x541E)
+TIOCSSERIAL = getattr(termios, "TIOCSSERIAL", 0x541F)
+ASYNC_LOW_LATENCY = 1 << 13
+SERIAL_STRUCT_SIZE = 128   # 不小于内核 struct serial_struct（x86_64 上为 72 字节）
+SERIAL_FLAGS_OFFSET = 16   # type, line, port, irq 之后的 int flags
+VMIN_MAX = 255             # VMIN 是 cc_t，最大 255
+
+
+def _baud_constant(baudrate: int) -> int:
+    try:
+        return getattr(termios, f"B{baudrate}")
+    except AttributeError:
+        raise ValueError(f"termios 不支持波特率 {baudrate}") from None
+
+
+class PosixSerial:
+    """
+    termios 串口：read / read_view / write / in_waiting / reset_input_buffer / close 与 pyserial 语义一致，
+    read 在 timeout 秒内未凑齐时返回已收到的部分。expect_reply(n) 设定此后每次等待的 VMIN。
+    - low_latency: 是否尝试开启驱动低延迟模式；结果见 self.low_latency 与 self.latency_timer
+    - rtt: LatencyHistogram，每次写出后到首段应答可读的耗时（含转换器延迟定时器），
+      用于对比不同后端/设置的实际往返时间
+    """
+    def __init__(self, port: str, baudrate: int = 460800, timeout: float = 0.001, low_latency: bool = True,
+                 buffer_size: int = 4096):
+        self.port = port
+        self.timeout = timeout
+        self.fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._poll = select.poll()
+        self._poll.register(self.fd, select.POLLIN)
+        self._head = 0             # 预读缓冲区中未取走数据的起止位置
+        self._tail = 0
+        self._attrs = None
+        self._vmin = None
+        self._baudrate = None
+        self._write_stamp = None
+        self.rtt = LatencyHistogram(resolution=2e-5, max_value=0.05)
+        self._configure(baudrate)
+        self.low_latency = self._set_low_latency() if low_latency else False
+        self.latency_timer = self._set_latency_timer() if low_latency else None
+
+    def _configure(self, baudrate: int):
+        """原始模式 8N1、无流控；VMIN 由 expect_reply 按应答长度调整"""
+        speed = _baud_constant(baudrate)
+        iflag, oflag, cflag, lflag, ispeed, ospeed, cc = termios.tcgetattr(self.fd)
+        iflag &= ~(termios.IGNBRK | termios.BRKINT | termios.PARMRK | termios.ISTRIP | termios.INLCR |
+                   termios.IGNCR | termios.ICRNL | termios.IXON | termios.IXOFF | termios.IXANY)
+        oflag &= ~termios.OPOST
+        lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG | termios.IEXTEN)
+        cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB | getattr(termios, "CRTSCTS", 0))
+        cflag |= termios.CS8 | termios.CLOCAL | termios.CREAD
+        cc[termios.VMIN] = 1
+        cc[termios.VTIME] = 0
+        self._attrs = [iflag, oflag, cflag, lflag, speed, speed, cc]
+        termios.tcsetattr(self.fd, termios.TCSANOW, self._attrs)
+        self._vmin = 1
+        self._baudrate = baudrate
+
+    def expect_reply(self, n_bytes: int):
+        """
+        下一段应答的总字节数：VMIN 设为该值（不超过 255），poll() 在整段到齐时唤醒；
+        与当前 VMIN 相同时直接返回，同一应答长度的连续事务不再调用 tcsetattr
+        """
+        n = max(1, min(n_bytes, VMIN_MAX))
+        if n == self._vmin:
+            return
+        self._attrs[6][termios.VMIN] = n
+        termios.tcsetattr(self.fd, termios.TCSANOW, self._attrs)
+        self._vmin = n
+
+    def _set_low_latency(self) -> bool:
+        """TIOCGSERIAL/TIOCSSERIAL 置 ASYNC_LOW_LATENCY；驱动不支持（如 pty、CDC-ACM）时返回 False"""
+        try:
+            buf = bytearray(SERIAL_STRUCT_SIZE)
+            fcntl.ioctl(self.fd, TIOCGSERIAL, buf)
+            flags, = struct.unpack_from("i", buf, SERIAL_FLAGS_OFFSET)
+            struct.pack_into("i", buf, SERIAL_FLAGS_OFFSET, flags | ASYNC_LOW_LATENCY)
+            fcntl.ioctl(self.fd, TIOCSSERIAL, buf)
+            return True
+        except OSError:
+            return False
+
+    def _set_latency_timer(self):
+        """USB 转串口的 latency_timer（ms）：可写时设为 1，返回当前值；不存在时返回 None"""
+        name = os.path.basename(os.path.realpath(self.port))
+        path = f"/sys/bus/usb-serial/devices/{name}/latency_timer"
+        try:
+            try:
+                with open(path, "w") as f:
+                    f.write("1")
+            except PermissionError:
+                pass
+            with open(path) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def baudrate(self) -> int:
+        return self._baudrate
+
+    @baudrate.setter
+    def baudrate(self, baudrate: int):
+        self._configure(baudrate)
+
+    @property
+    def is_open(self) -> bool:
+        return self.fd is not None
+
+    def fileno(self) -> int:
+        return self.fd
+
+    @property
+    def in_waiting(self) -> int:
+        buf = bytearray(4)
+        fcntl.ioctl(self.fd, termios.FIONREAD, buf)
+        return struct.unpack("i", buf)[0] + self._tail - self._head
+
+    def write(self, data) -> int:
+        """写出全部数据；输出缓冲区满时等待其可写"""
+        view = memoryview(data)
+        total = len(view)
+        self._write_stamp = time.perf_counter()
+        while view:
+            try:
+                n = os.write(self.fd, view)
+            except BlockingIOError:
+                select.select([], [self.fd], [])
+                continue
+            view = view[n:]
+        return total
+
+    def read_view(self, size: int = 1) -> memoryview:
+        """
+        返回内部缓冲区中至多 size 字节的切片（下次读取前有效）；
+        缓冲区取空时读入已到达的全部字节，尚无数据则等待凑齐 VMIN 字节，timeout 秒后返回已到达的部分（可能为空）
+        """
+        if self._head == self._tail:
+            self._head = 0
+            self._tail = self._fill()
+        start = self._head
+        self._head = min(start + size, self._tail)
+        return self._view[start:self._head]
+
+    def _fill(self) -> int:
+        n = self._readv()
+        if n == 0:
+            self._poll.poll(self.timeout * 1000.0)
+            n = self._readv()
+        return n
+
+    def _readv(self) -> int:
+        try:
+            n = os.readv(self.fd, [self._view])
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return 0
+            raise
+        if n and self._write_stamp is not None:
+            self.rtt.record(time.perf_counter() - self._write_stamp)
+            self._write_stamp = None
+        return n
+
+    def read(self, size: int = 1) -> bytes:
+        return bytes(self.read_view(size))
+
+    def reset_input_buffer(self):
+        termios.tcflush(self.fd, termios.TCIFLUSH)
+        self._head = self._tail = 0
+
+    def open(self):
+        pass
+
+    def close(self):
+        if self.fd is not None:
+            self._poll.unregister(self.fd)
+            os.close(self.fd)
+            self.fd = None
@@ -1,4 +1,10 @@
 import math
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # 仅批量编解码接口依赖 numpy
+    np = None
 
 class MotorProtocolError(Exception): pass
 class MotorTimeoutError(IOError): pass
@@ -31,34 +37,232 @@ def build_frame(cmd: int, motor_id: int, data: list[int] = []) -> bytes:
         frame += data + [checksum(data)]
     return bytes(frame)
 
-def parse_status1(data: bytes) -> dict:
+FRAME_HEADER = 0x3E
+MAX_DATA_LEN = 58  # 最长应答为 0x12 设备信息帧
+# 重发会产生额外效果的命令（增量位置控制），超时后不得自动重试
+NON_IDEMPOTENT_COMMANDS = frozenset((0xA7, 0xA8))
+
+
+def frame_length(data_len: int) -> int:
+    """按帧头 len 字节计算完整帧长度：5 字节帧头 + 数据段 + 数据校验（无数据时没有校验字节）"""
+    return 5 + (data_len + 1 if data_len else 0)
+
+
+class FrameParser:
+    """
+    增量帧解析器：在滚动缓冲区中搜索 0x3E 帧头，
+    校验帧头校验和与 len 字节后输出完整帧；遇到垃圾字节逐字节重同步，不丢弃其后的合法帧。
+    """
+    def __init__(self):
+        self.buf = bytearray()
+        self.header_errors = 0    # 帧头非法（非 0x3E、帧头校验错、len 越界）丢弃的字节数
+        self.checksum_errors = 0  # 数据段校验失败的候选帧数
+
+    def feed(self, data: bytes):
+        """追加收到的字节"""
+        self.buf += data
+
+    def next_frame(self):
+        """取出下一条完整帧（bytes），数据不足时返回 None"""
+        buf = self.buf
+        while True:
+            start = buf.find(FRAME_HEADER)
+            if start < 0:
+                self.header_errors += len(buf)
+                buf.clear()
+                return None
+            if start > 0:
+                self.header_errors += start
+                del buf[:start]
+            if len(buf) < 5:
+                return None
+            if (buf[0] + buf[1] + buf[2] + buf[3]) & 0xFF != buf[4] or buf[3] > MAX_DATA_LEN:
+                self.header_errors += 1
+                del buf[:1]
+                continue
+            length = frame_length(buf[3])
+            if len(buf) < length:
+                return None
+            if buf[3] and sum(buf[5:length - 1]) & 0xFF != buf[length - 1]:
+                self.checksum_errors += 1
+                del buf[:1]
+                continue
+            frame = bytes(buf[:length])
+            del buf[:length]
+            return frame
+
+    def frames(self):
+        """依次取出缓冲区中所有完整帧"""
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def needed(self) -> int:
+        """补全下一帧至少还需要的字节数（用于精确读取，避免多读）"""
+        buf = self.buf
+        if len(buf) < 5 or buf[0] != FRAME_HEADER:
+            return max(1, 5 - len(buf))
+        return max(1, frame_length(buf[3]) - len(buf))
+
+    def resync(self):
+        """超时仍未凑齐一帧时调用：丢弃当前帧头字节，从下一个候选帧头重新同步"""
+        if self.buf:
+            self.header_errors += 1
+            del self.buf[:1]
+
+
+def iq_to_int(iq: float) -> int:
+    """将目标电流 Iq（A）量化为 0xA1 扭矩环命令的整数值（-2048~2047 对应 -33A~33A）"""
+    iq_int = int(round(iq * (2048 / 33.0)))
+    return max(-2048, min(2047, iq_int))
+
+def iq_to_payload(iq: float) -> list[int]:
+    """将目标电流 Iq（A）量化为 0xA1 扭矩环命令的 2 字节负载"""
+    return list(iq_to_int(iq).to_bytes(2, 'little', signed=True))
+
+
+# 各控制命令的负载布局（小端）
+PACK_I16 = struct.Struct('<h')             # 0xA0 开环功率 / 0xA1 扭矩
+PACK_I32 = struct.Struct('<i')             # 0xA2 速度 / 0xA7 增量位置
+PACK_I64 = struct.Struct('<q')             # 0xA3 多圈位置
+PACK_I64_U32 = struct.Struct('<qI')        # 0xA4 多圈位置 + 限速
+PACK_CIRCLE = struct.Struct('<BHB')        # 0xA5 方向 + 单圈位置 + 保留
+PACK_CIRCLE_SPEED = struct.Struct('<BHBI') # 0xA6 方向 + 单圈位置 + 保留 + 限速
+PACK_I32_U32 = struct.Struct('<iI')        # 0xA8 增量位置 + 限速
+PACK_MIT = struct.Struct('8B')             # 0xA8 MIT 控制负载（已按位打包）
+
+
+class FrameTemplate:
+    """
+    预分配的单命令帧：帧头及其校验和只在创建时计算一次，
+    之后每次发送仅用 struct.pack_into 原地写入负载并更新数据校验，不产生中间对象。
+    pack() 返回的是同一个 bytearray，发送完成前不要再次 pack。
+    """
+    def __init__(self, cmd: int, motor_id: int, packer: struct.Struct):
+        size = packer.size
+        self.packer = packer
+        self.buf = bytearray(frame_length(size))
+        self.buf[0:4] = bytes((FRAME_HEADER, cmd, motor_id, size))
+        self.buf[4] = checksum(self.buf[0:4])
+        self._data = memoryview(self.buf)[5:5 + size]
+        self._sum_index = 5 + size
+
+    def pack(self, *values) -> bytearray:
+        self.packer.pack_into(self.buf, 5, *values)
+        self.buf[self._sum_index] = sum(self._data) & 0xFF
+        return self.buf
+
+# MIT 控制帧（0xA8）量化范围
+MIT_Q_MAX = 360.0           # 位置，°
+MIT_DQ_MAX = 2000.0 * 100   # 速度，0.01°/s
+MIT_KP_MAX = 500.0
+MIT_KD_MAX = 5.0
+MIT_IQ_MAX = 33.0           # 前馈电流，A
+MIT_KT = 1.1                # 前馈力矩 → 电流的换算系数，Nm/A
+
+def encode_mit_payload(q: float, dq: float, kp: float, kd: float, tau: float = 0.0) -> list[int]:
+    """
+    MIT 控制 8 字节负载：q(16bit) | dq(12bit) | kp(12bit) | kd(12bit) | tau(12bit)
+    - q: 期望位置（°），dq: 期望速度（°/s），tau: 前馈力矩（Nm）
+    """
+    q_uint = float_to_uint(q, -MIT_Q_MAX, MIT_Q_MAX, 16)
+    dq_uint = float_to_uint(dq * 100, -MIT_DQ_MAX, MIT_DQ_MAX, 12)
+    kp_uint = float_to_uint(kp, 0, MIT_KP_MAX, 12)
+    kd_uint = float_to_uint(kd, 0, MIT_KD_MAX, 12)
+    iq = max(-MIT_IQ_MAX, min(MIT_IQ_MAX, tau / MIT_KT))
+    tau_uint = float_to_uint(iq, -MIT_IQ_MAX, MIT_IQ_MAX, 12)
+
+    return [
+        (q_uint >> 8) & 0xFF,
+        q_uint & 0xFF,
+        (dq_uint >> 4) & 0xFF,
+        ((dq_uint & 0xF) << 4) | ((kp_uint >> 8) & 0xF),
+        kp_uint & 0xFF,
+        (kd_uint >> 4) & 0xFF,
+        ((kd_uint & 0xF) << 4) | ((tau_uint >> 8) & 0xF),
+        tau_uint & 0xFF,
+    ]
+
+# 应答数据段布局（小端）
+STATUS1_STRUCT = struct.Struct('<bH2xBB')   # 温度 | 电压(0.01V) | 保留 | 状态位 | 错误位
+STATUS2_STRUCT = struct.Struct('<bhhH')     # 温度 | iq/功率 | 速度 | 编码器
+ENCODER_STRUCT = struct.Struct('<HHH')      # 编码器 | 原始值 | 偏移
+ANGLE64_STRUCT = struct.Struct('<q')        # 多圈角度(0.01°)
+
+
+class _Record:
+    """
+    __slots__ 状态记录的公共基类：一次 unpack_from 直接从接收缓冲区解码，
+    并保留按键访问（record['temperature'] / record.get(...)），兼容原先返回 dict 的调用方。
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()})"
+
+
+class Status1(_Record):
+    """状态1（命令 0x9A）"""
+    __slots__ = ('temperature', 'voltage_raw', 'motor_state', 'error_flags')
+
+    def decode(self, buf, offset: int = 0):
+        (self.temperature, self.voltage_raw, self.motor_state,
+         self.error_flags) = STATUS1_STRUCT.unpack_from(buf, offset)
+        return self
+
+    @property
+    def voltage(self) -> float:
+        """母线电压，单位 V"""
+        return self.voltage_raw * 0.01
+
+
+class Status2(_Record):
+    """状态2（命令 0x9C 及闭环控制命令应答）"""
+    __slots__ = ('temperature', 'iq_or_power', 'speed_dps', 'encoder_value')
+
+    def decode(self, buf, offset: int = 0):
+        (self.temperature, self.iq_or_power, self.speed_dps,
+         self.encoder_value) = STATUS2_STRUCT.unpack_from(buf, offset)
+        return self
+
+
+class EncoderReading(_Record):
+    """编码器读取（命令 0x90）"""
+    __slots__ = ('encoder', 'raw', 'offset')
+
+    def decode(self, buf, offset: int = 0):
+        self.encoder, self.raw, self.offset = ENCODER_STRUCT.unpack_from(buf, offset)
+        return self
+
+
+def parse_status1(data: bytes, offset: int = 0) -> Status1:
     """
     解析“状态1”数据结构（命令 0x9A）
     包括温度、电压、电机状态位、错误位等
     """
-    return {
-        'temperature': int.from_bytes(data[0:1], 'little', signed=True),
-        'voltage': int.from_bytes(data[1:3], 'little') * 0.01,
-        'motor_state': data[5],
-        'error_flags': data[6],
-    }
+    return Status1().decode(data, offset)
 
-def parse_status2(data: bytes) -> dict:
+def parse_status2(data: bytes, offset: int = 0) -> Status2:
     """解析“状态2”结构（命令 0x9C）"""
-    return {
-        'temperature': int.from_bytes(data[0:1], 'little', signed=True),
-        'iq_or_power': int.from_bytes(data[1:3], 'little', signed=True),
-        'speed_dps': int.from_bytes(data[3:5], 'little', signed=True),
-        'encoder_value': int.from_bytes(data[5:7], 'little'),
-    }
-
-def parse_encoder(data: bytes) -> dict:
+    return Status2().decode(data, offset)
+
+def parse_encoder(data: bytes, offset: int = 0) -> EncoderReading:
     """解析编码器读取帧（命令 0x90）"""
-    return {
-        'encoder': int.from_bytes(data[0:2], 'little'),
-        'raw': int.from_bytes(data[2:4], 'little'),
-        'offset': int.from_bytes(data[4:6], 'little'),
-    }
+    return EncoderReading().decode(data, offset)
 
 def parse_angle64(data: bytes) -> float:
     """
@@ -90,4 +294,119 @@ def degree_to_radian(degree: float) -> float:
     return degree * ( math.pi / 180.0)
 
 def radian_to_degree(radian: float) -> float:
-    return (radian * 180.0) / math.pi
\ No newline at end of file
+    return (radian * 180.0) / math.pi
+
+
+# ---------------------------------------------------------------------------
+# 批量编解码（numpy）：一次处理多个电机，输出/输入为连续的帧缓冲区
+# ---------------------------------------------------------------------------
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("批量编解码需要 numpy，请先安装: pip install numpy")
+
+def build_frames_batch(cmd: int, motor_ids, payloads) -> bytes:
+    """
+    批量构造同一命令的多帧：
+    - motor_ids: (N,) 电机 ID
+    - payloads: (N, L) uint8 数据负载，L 可为 0
+    返回 N 帧首尾相连的 bytes
+    """
+    _require_numpy()
+    ids = np.asarray(motor_ids, dtype=np.uint8)
+    payloads = np.asarray(payloads, dtype=np.uint8).reshape(len(ids), -1)
+    data_len = payloads.shape[1]
+    frames = np.empty((len(ids), frame_length(data_len)), dtype=np.uint8)
+    frames[:, 0] = FRAME_HEADER
+    frames[:, 1] = cmd
+    frames[:, 2] = ids
+    frames[:, 3] = data_len
+    frames[:, 4] = (FRAME_HEADER + cmd + data_len + ids.astype(np.uint32)) & 0xFF
+    if data_len:
+        frames[:, 5:-1] = payloads
+        frames[:, -1] = payloads.sum(axis=1, dtype=np.uint32) & 0xFF
+    return frames.tobytes()
+
+def float_to_uint_batch(x, x_min: float, x_max: float, bits: int):
+    """float_to_uint 的向量化版本"""
+    _require_numpy()
+    x = np.clip(np.asarray(x, dtype=np.float64), x_min, x_max)
+    return ((x - x_min) * ((1 << bits) - 1) / (x_max - x_min)).astype(np.int64)
+
+def _le_bytes(values, dtype: str):
+    """整数数组 → (N, itemsize) 小端字节矩阵"""
+    values = np.ascontiguousarray(values, dtype=dtype)
+    return values.view(np.uint8).reshape(len(values), -1)
+
+def encode_torque_batch(motor_ids, iq) -> bytes:
+    """批量 0xA1 扭矩环命令，iq 单位 A"""
+    _require_numpy()
+    iq_int = np.clip(np.rint(np.asarray(iq, dtype=np.float64) * (2048 / 33.0)), -2048, 2047)
+    return build_frames_batch(0xA1, motor_ids, _le_bytes(iq_int, '<i2'))
+
+def encode_speed_batch(motor_ids, speed_dps) -> bytes:
+    """批量 0xA2 速度环命令，speed_dps 单位 °/s（与 LkMotor.set_speed 相同量化）"""
+    _require_numpy()
+    val = np.trunc(np.asarray(speed_dps, dtype=np.float64) * 1000)
+    return build_frames_batch(0xA2, motor_ids, _le_bytes(val, '<i4'))
+
+def encode_position_batch(motor_ids, angle_deg) -> bytes:
+    """批量 0xA3 多圈位置环命令，angle_deg 单位 °"""
+    _require_numpy()
+    val = np.trunc(np.asarray(angle_deg, dtype=np.float64) * 100)
+    return build_frames_batch(0xA3, motor_ids, _le_bytes(val, '<i8'))
+
+def encode_mit_batch(motor_ids, q, dq, kp, kd, tau=0.0) -> bytes:
+    """批量 MIT 控制帧（0xA8），参数单位同 encode_mit_payload，均可为标量或 (N,) 数组"""
+    _require_numpy()
+    n = len(motor_ids)
+    q_uint = float_to_uint_batch(np.broadcast_to(q, n), -MIT_Q_MAX, MIT_Q_MAX, 16)
+    dq_uint = float_to_uint_batch(np.broadcast_to(dq, n) * 100.0, -MIT_DQ_MAX, MIT_DQ_MAX, 12)
+    kp_uint = float_to_uint_batch(np.broadcast_to(kp, n), 0, MIT_KP_MAX, 12)
+    kd_uint = float_to_uint_batch(np.broadcast_to(kd, n), 0, MIT_KD_MAX, 12)
+    iq = np.clip(np.broadcast_to(tau, n) / MIT_KT, -MIT_IQ_MAX, MIT_IQ_MAX)
+    tau_uint = float_to_uint_batch(iq, -MIT_IQ_MAX, MIT_IQ_MAX, 12)
+
+    buf = np.empty((n, 8), dtype=np.uint8)
+    buf[:, 0] = q_uint >> 8
+    buf[:, 1] = q_uint & 0xFF
+    buf[:, 2] = dq_uint >> 4
+    buf[:, 3] = ((dq_uint & 0xF) << 4) | (kp_uint >> 8)
+    buf[:, 4] = kp_uint & 0xFF
+    buf[:, 5] = kd_uint >> 4
+    buf[:, 6] = ((kd_uint & 0xF) << 4) | (tau_uint >> 8)
+    buf[:, 7] = tau_uint & 0xFF
+    return build_frames_batch(0xA8, motor_ids, buf)
+
+if np is not None:
+    # 应答帧的结构化布局：帧头 5 字节 + 数据段 + 数据校验
+    _FRAME_HEAD = [('header', 'u1'), ('cmd', 'u1'), ('motor_id', 'u1'), ('len', 'u1'), ('head_sum', 'u1')]
+    STATUS2_FRAME_DTYPE = np.dtype(_FRAME_HEAD + [
+        ('temperature', 'i1'), ('iq_or_power', '<i2'), ('speed_dps', '<i2'), ('encoder_value', '<u2'),
+        ('data_sum', 'u1'),
+    ])
+    ANGLE64_FRAME_DTYPE = np.dtype(_FRAME_HEAD + [('angle', '<i8'), ('data_sum', 'u1')])
+
+def _parse_frames_batch(buf: bytes, dtype):
+    """将等长应答帧缓冲区零拷贝视为结构化数组，并丢弃帧头/校验不合法的记录"""
+    _require_numpy()
+    n = len(buf) // dtype.itemsize
+    raw = np.frombuffer(buf, dtype=np.uint8, count=n * dtype.itemsize).reshape(n, dtype.itemsize)
+    head_ok = (raw[:, 0] == FRAME_HEADER) & (raw[:, :4].sum(axis=1, dtype=np.uint32) & 0xFF == raw[:, 4])
+    data_ok = raw[:, 5:-1].sum(axis=1, dtype=np.uint32) & 0xFF == raw[:, -1]
+    records = np.frombuffer(buf, dtype=dtype, count=n)
+    return records[head_ok & data_ok]
+
+def parse_status2_batch(buf: bytes):
+    """
+    批量解析状态2格式应答（0x9C 及闭环命令应答，每帧 13 字节）
+    返回结构化数组，字段：motor_id / temperature / iq_or_power / speed_dps / encoder_value
+    """
+    return _parse_frames_batch(buf, STATUS2_FRAME_DTYPE)
+
+def parse_angle64_batch(buf: bytes):
+    """
+    批量解析 0x92 多圈角度应答（每帧 14 字节）
+    返回结构化数组，字段：motor_id / angle（单位 0.01°）
+    """
+    return _parse_frames_batch(buf, ANGLE64_FRAME_DTYPE)
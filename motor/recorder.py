@@ -0,0 +1,138 @@
+import mmap
+import struct
+import threading
+import time
+from motor.protocol import np, _require_numpy
+
+# 文件头：魔数 | 版本 | 单条记录字节数 | 已写入记录数
+FILE_MAGIC = b'LKTL'
+FILE_HEADER = struct.Struct('<4sHHQ')
+# 单条记录：时间戳(s) | 电机 ID | 命令 | 保留 | 位置(rad) | 速度(rad/s) | iq 原始值 | 编码器 | 往返耗时(s)
+RECORD = struct.Struct('<dBB2xdfhHf')
+
+if np is not None:
+    RECORD_DTYPE = np.dtype({
+        'names': ['timestamp', 'motor_id', 'cmd', 'position', 'velocity', 'iq', 'encoder', 'latency'],
+        'formats': ['<f8', 'u1', 'u1', '<f8', '<f4', '<i2', '<u2', '<f4'],
+        'offsets': [0, 8, 9, 12, 20, 24, 26, 28],
+        'itemsize': RECORD.size,
+    })
+
+_NAN = float('nan')
+
+
+class TelemetryRecorder:
+    """
+    高频二进制遥测记录器：
+    - record() 把定长记录写入预分配的环形缓冲区，调用方只付出一次 pack_into 的开销
+    - 后台线程定期把新记录搬运到内存映射的日志文件中，文件不足时按块扩容
+    - 环形缓冲区写满（刷盘跟不上）时丢弃新记录并计数，不阻塞控制循环
+    用 load_telemetry() 读取日志为 numpy 结构化数组。
+    """
+    def __init__(self, path: str, capacity: int = 1 << 16, flush_interval: float = 0.05,
+                 chunk_records: int = 1 << 18):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.chunk_bytes = chunk_records * RECORD.size
+        self.ring = bytearray(capacity * RECORD.size)
+        self.dropped = 0
+        self._head = 0     # 已写入环形缓冲区的记录总数
+        self._tail = 0     # 已刷入文件的记录总数
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._file = open(path, 'w+b')
+        self._file.truncate(FILE_HEADER.size + self.chunk_bytes)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        FILE_HEADER.pack_into(self._map, 0, FILE_MAGIC, 1, RECORD.size, 0)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lk-telemetry", daemon=True)
+        self._thread.start()
+
+    def record(self, motor_id: int, cmd: int, state, latency: float = 0.0):
+        """追加一条记录；state 为 MotorState（未知字段记为 NaN / 0）"""
+        position = state.position
+        velocity = state.velocity
+        with self._lock:
+            if self._head - self._tail >= self.capacity:
+                self.dropped += 1
+                return
+            RECORD.pack_into(self.ring, (self._head % self.capacity) * RECORD.size,
+                             time.time(), motor_id, cmd,
+                             _NAN if position is None else position,
+                             _NAN if velocity is None else velocity,
+                             state.iq_raw or 0, state.encoder_value or 0, latency)
+            self._head += 1
+
+    def _grow(self, needed: int):
+        size = self._map.size()
+        while size < needed:
+            size += self.chunk_bytes
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def flush(self):
+        """把环形缓冲区中的新记录搬运到日志文件"""
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        head = self._head
+        tail = self._tail
+        if head == tail:
+            return
+        end = FILE_HEADER.size + head * RECORD.size
+        if end > self._map.size():
+            self._grow(end)
+        pos = FILE_HEADER.size + tail * RECORD.size
+        while tail < head:
+            start = tail % self.capacity
+            count = min(head - tail, self.capacity - start)
+            n_bytes = count * RECORD.size
+            self._map[pos:pos + n_bytes] = self.ring[start * RECORD.size:start * RECORD.size + n_bytes]
+            pos += n_bytes
+            tail += count
+        FILE_HEADER.pack_into(self._map, 0, FILE_MAGIC, 1, RECORD.size, head)
+        self._tail = head
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        """停止后台线程，写完剩余记录并把文件截断到实际长度"""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join()
+        self.flush()
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(FILE_HEADER.size + self._tail * RECORD.size)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_telemetry(path: str):
+    """
+    读取遥测日志为 numpy 结构化数组，字段：
+    timestamp / motor_id / cmd / position / velocity / iq / encoder / latency
+    """
+    _require_numpy()
+    with open(path, 'rb') as f:
+        magic, version, record_size, count = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+    if magic != FILE_MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} 不是有效的遥测日志")
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=FILE_HEADER.size, shape=(count,))
@@ -0,0 +1,182 @@
+import collections
+import time
+from concurrent.futures import Future
+from motor.loop import LoopRunner
+
+# 优先级：数值越小越优先；CONTROL 每个周期必定执行，其余只占用控制流量之后的剩余时间
+CONTROL = 0
+TELEMETRY = 1
+DIAGNOSTIC = 2
+ON_DEMAND = 3
+
+# 常用事务的线上字节数（请求帧 + 应答帧），用于首次执行前估计耗时
+REFRESH_BYTES = 5 + 14 + 5 + 13       # 0x92 + 0x9C
+STATUS2_BYTES = 5 + 13                # 0x9C
+STATUS1_BYTES = 5 + 13                # 0x9A
+ENCODER_BYTES = 5 + 12                # 0x90
+PARAM_BYTES = 8 + 13                  # 0x40
+DEVICE_INFO_BYTES = 5 + 64            # 0x12
+
+
+class Task:
+    """调度器中的一个任务；duration 为实测耗时的 EWMA，用于判断剩余时间是否放得下"""
+    __slots__ = ('name', 'fn', 'period', 'priority', 'frame_bytes', 'next_due', 'duration',
+                 'runs', 'deferrals', 'errors', 'last_result', 'last_run', 'future')
+
+    def __init__(self, name, fn, period, priority, frame_bytes, future=None):
+        self.name = name
+        self.fn = fn
+        self.period = period          # None 表示一次性任务
+        self.priority = priority
+        self.frame_bytes = frame_bytes
+        self.next_due = 0.0
+        self.duration = None
+        self.runs = 0
+        self.deferrals = 0            # 到期但因本周期剩余时间不足而顺延的次数
+        self.errors = 0
+        self.last_result = None
+        self.last_run = None
+        self.future = future
+
+
+class BusScheduler:
+    """
+    单条总线的多速率轮询调度器：
+    - 周期任务按各自频率到期，例如位置/速度 1 kHz（CONTROL）、状态1 2 Hz（DIAGNOSTIC）
+    - request() 提交按需任务（如参数读取），返回 Future
+    每个周期先执行全部 CONTROL 任务，再按（优先级, 到期时间）把其余到期任务填入周期剩余时间：
+    预计耗时（按帧长与波特率估算，执行后改用实测 EWMA）放不下的任务顺延到下个周期，
+    每次顺延按 alpha 衰减其实测耗时，直到再次放得下并重新测量；
+    非 CONTROL 任务执行期间总线等待应答不超过本周期预算的截止时刻：失联电机的诊断读取按超时失败，
+    而不会阻塞到驱动超时，因此诊断流量不会推迟下一周期的控制流量。
+    - budget: 每周期可用于总线事务的时间占比，留出余量吸收抖动
+    放不进任何周期（预计耗时超过周期预算减去控制任务耗时）的按需任务以 RuntimeError 结束其 Future，
+    而不是挤占控制流量。
+    """
+    TURNAROUND = 0.0005  # 驱动收到请求到开始应答的典型时间（秒）
+
+    def __init__(self, bus, cycle_hz: float = 1000.0, budget: float = 0.8, alpha: float = 0.2):
+        self.bus = bus
+        self.cycle_hz = cycle_hz
+        self.period = 1.0 / cycle_hz
+        self.budget = budget
+        self.alpha = alpha
+        self.tasks = []
+        self._requests = collections.deque()
+        self.cycles = 0
+        self.runner = None
+
+    def add_periodic(self, name: str, fn, rate_hz: float, priority: int = TELEMETRY,
+                     frame_bytes: int = STATUS2_BYTES) -> Task:
+        """
+        注册周期任务：fn() 在每 1/rate_hz 秒至少到期一次；
+        rate_hz 不低于周期频率的 CONTROL 任务每周期执行
+        """
+        task = Task(name, fn, 1.0 / rate_hz, priority, frame_bytes)
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: t.priority)
+        return task
+
+    def remove(self, name: str):
+        self.tasks = [task for task in self.tasks if task.name != name]
+
+    def request(self, fn, frame_bytes: int = PARAM_BYTES, priority: int = ON_DEMAND, name: str = "request") -> Future:
+        """提交一次性任务（可在其他线程调用），结果通过返回的 Future 取得"""
+        future = Future()
+        self._requests.append(Task(name, fn, None, priority, frame_bytes, future))
+        return future
+
+    def estimate(self, task: Task) -> float:
+        """任务预计耗时：实测 EWMA 与线上传输时间取大者；未执行过时另加 TURNAROUND 驱动处理余量"""
+        wire = self.bus.wire_time(task.frame_bytes)
+        if task.duration is None:
+            return wire + self.TURNAROUND
+        return max(task.duration, wire)
+
+    def _execute(self, task: Task, now: float, deadline: float = None):
+        """执行任务；给出 deadline 时任务内的总线事务等待应答不超过该时刻（见 LkBus.limit_deadline）"""
+        start = time.perf_counter()
+        try:
+            if deadline is None:
+                task.last_result = task.fn()
+            else:
+                with self.bus.limit_deadline(deadline):
+                    task.last_result = task.fn()
+            if task.future is not None:
+                task.future.set_result(task.last_result)
+        except Exception as e:
+            task.errors += 1
+            if task.future is not None:
+                task.future.set_exception(e)
+            else:
+                print(f"[调度] 任务 {task.name} 失败: {e}")
+        end = time.perf_counter()
+        elapsed = end - start
+        task.duration = elapsed if task.duration is None else task.duration + self.alpha * (elapsed - task.duration)
+        task.runs += 1
+        task.last_run = end
+        if task.period is not None:
+            # 以到期时刻推进，避免长期漂移；落后一个周期以上时从当前时刻重新对齐
+            task.next_due = max(task.next_due + task.period, now)
+        return end
+
+    def control_time(self) -> float:
+        """每周期 CONTROL 任务的预计总耗时"""
+        return sum(self.estimate(task) for task in self.tasks if task.priority == CONTROL)
+
+    def cycle(self):
+        """执行一个调度周期"""
+        start = time.perf_counter()
+        deadline = start + self.period * self.budget
+        self.cycles += 1
+
+        now = start
+        for task in self.tasks:
+            if task.priority == CONTROL and task.next_due <= start:
+                now = self._execute(task, start)
+
+        while self._requests:
+            self.tasks.append(self._requests.popleft())
+        due = sorted((task for task in self.tasks if task.priority != CONTROL and task.next_due <= start),
+                     key=lambda t: (t.priority, t.next_due))
+        window = self.period * self.budget - self.control_time()
+        for task in due:
+            estimate = self.estimate(task)
+            if now + estimate > deadline:
+                if task.period is None and estimate > window:
+                    self.tasks.remove(task)
+                    task.future.set_exception(RuntimeError(
+                        f"任务 {task.name} 预计耗时 {estimate * 1e3:.2f} ms 超出每周期空闲时间 {window * 1e3:.2f} ms"))
+                    continue
+                task.deferrals += 1
+                if task.duration is not None:
+                    # 每次顺延按 alpha 衰减实测耗时：一次偶发的长耗时（如超时）不会让任务永远放不下、
+                    # 也就永远得不到重新测量的机会
+                    task.duration -= self.alpha * task.duration
+                continue
+            now = self._execute(task, start, deadline)
+            if task.period is None:
+                self.tasks.remove(task)
+
+    def run(self, duration: float = None, max_cycles: int = None) -> LoopRunner:
+        """以 cycle_hz 运行调度循环，返回 LoopRunner 以便查询周期统计"""
+        self.runner = LoopRunner(self.cycle, self.cycle_hz)
+        self.runner.run(duration, max_cycles)
+        return self.runner
+
+    def stop(self):
+        if self.runner is not None:
+            self.runner.stop()
+
+    def stats(self) -> dict:
+        """各任务的执行次数、顺延次数、错误数与实测耗时"""
+        return {
+            task.name: {
+                "priority": task.priority,
+                "runs": task.runs,
+                "deferrals": task.deferrals,
+                "errors": task.errors,
+                "duration": task.duration,
+            }
+            for task in self.tasks if task.period is not None
+        }
@@ -0,0 +1,329 @@
+"""
+伪终端（pty）上的瓴控电机仿真端点，无需硬件即可对 LkMotor / MotorGroup / MITController 做联调与基准测试：
+
+    sim = SimulatedBus(motor_ids=[1, 2], baudrate=460800, reply_latency=0.0002)
+    sim.start()
+    motor = LkMotor(sim.port, motor_id=1)
+
+或命令行：python -m motor.simulator --ids 1 2
+"""
+import math
+import os
+import random
+import select
+import struct
+import threading
+import time
+import tty
+from motor.protocol import *
+from motor.state import ANGLE_RAW_TO_RAD, SPEED_RAW_TO_RAD_S, IQ_RAW_TO_A, ENCODER_RANGE, ENCODER_REV_RAW
+
+# 仿真器编码应答，取解码换算系数的倒数，保证与 MotorState 的解码始终一致
+ANGLE_RAW_PER_RAD = 1.0 / ANGLE_RAW_TO_RAD
+SPEED_RAW_PER_RAD_S = 1.0 / SPEED_RAW_TO_RAD_S
+IQ_RAW_PER_A = 1.0 / IQ_RAW_TO_A
+
+
+class SimulatedMotor:
+    """单个电机的刚体模型：J·dω/dt = kt·iq − b·ω，带简单的位置/速度闭环"""
+    def __init__(self, motor_id: int, inertia: float = 0.002, damping: float = 0.01, kt: float = 0.9,
+                 temperature: int = 35, voltage: float = 24.0):
+        self.motor_id = motor_id
+        self.inertia = inertia
+        self.damping = damping
+        self.kt = kt                  # Nm/A，与 MotorState 中的 0.09 × 10 一致
+        self.temperature = temperature
+        self.voltage = voltage
+        self.enabled = True
+        self.mode = 'torque'          # torque / speed / position
+        self.iq_cmd = 0.0             # 目标电流，A
+        self.speed_cmd = 0.0          # 目标速度，rad/s
+        self.position_cmd = 0.0       # 目标位置，rad
+        self.position = 0.0           # rad
+        self.velocity = 0.0           # rad/s
+        self.iq = 0.0                 # 实际电流，A
+        self.zero = 0.0
+        self.error_flags = 0
+        self.params = {}
+
+    def step(self, dt: float):
+        if not self.enabled:
+            iq = 0.0
+        elif self.mode == 'speed':
+            iq = 2.0 * (self.speed_cmd - self.velocity)
+        elif self.mode == 'position':
+            iq = 20.0 * (self.position_cmd - self.position) - 1.0 * self.velocity
+        else:
+            iq = self.iq_cmd
+        self.iq = max(-33.0, min(33.0, iq))
+        accel = (self.kt * self.iq - self.damping * self.velocity) / self.inertia
+        self.velocity += accel * dt
+        self.position += self.velocity * dt
+
+    @property
+    def angle_raw(self) -> int:
+        return int((self.position - self.zero) * ANGLE_RAW_PER_RAD)
+
+    @property
+    def encoder(self) -> int:
+        # 编码器装在转子上：一圈对应 0x92 的 36000 个原始单位（0.01°/LSB）
+        turns = (self.position - self.zero) * ANGLE_RAW_PER_RAD / ENCODER_REV_RAW
+        return int((turns - math.floor(turns)) * ENCODER_RANGE) % ENCODER_RANGE
+
+    def status2_payload(self) -> bytes:
+        iq_raw = max(-2048, min(2047, int(round(self.iq * IQ_RAW_PER_A))))
+        speed_raw = max(-32768, min(32767, int(self.velocity * SPEED_RAW_PER_RAD_S)))
+        return STATUS2_STRUCT.pack(self.temperature, iq_raw, speed_raw, self.encoder)
+
+
+class SimulatedBus:
+    """
+    一条仿真 RS485 总线：在 pty 从端上暴露串口设备（sim.port），
+    后台线程解析主机命令帧、推进各电机动力学并按协议应答。
+    - baudrate: 按 10 bit/字节模拟线上传输耗时（0 表示不模拟）
+    - reply_latency: 驱动收到命令到开始应答的处理延迟（秒）
+    - corrupt_rate / drop_rate: 应答中随机翻转一个字节 / 整帧丢弃的概率
+    - garbage_rate: 在应答前插入随机垃圾字节的概率
+    - mit_a8: 0xA8 按 MIT 控制负载解析（LkMotor.apply_mit_control），False 时按增量位置 + 限速解析
+    """
+    def __init__(self, motor_ids=(1,), baudrate: int = 460800, reply_latency: float = 0.0002,
+                 corrupt_rate: float = 0.0, drop_rate: float = 0.0, garbage_rate: float = 0.0,
+                 physics_dt: float = 0.0005, mit_a8: bool = True, seed: int = None):
+        self.motors = {mid: SimulatedMotor(mid) for mid in motor_ids}
+        self.baudrate = baudrate
+        self.reply_latency = reply_latency
+        self.corrupt_rate = corrupt_rate
+        self.drop_rate = drop_rate
+        self.garbage_rate = garbage_rate
+        self.physics_dt = physics_dt
+        self.mit_a8 = mit_a8
+        self.rng = random.Random(seed)
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._parser = FrameParser()
+        self._direct_parser = FrameParser()  # process() 使用，与 pty 线程互不干扰
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._sim_time = time.perf_counter()
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lk-sim", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wire_time(self, n_bytes: int) -> float:
+        return n_bytes * 10.0 / self.baudrate if self.baudrate else 0.0
+
+    def _advance(self):
+        """把所有电机的动力学推进到当前时刻"""
+        now = time.perf_counter()
+        with self._lock:
+            while self._sim_time + self.physics_dt <= now:
+                for motor in self.motors.values():
+                    motor.step(self.physics_dt)
+                self._sim_time += self.physics_dt
+
+    def _run(self):
+        while self._running:
+            ready, _, _ = select.select([self._master], [], [], self.physics_dt)
+            self._advance()
+            if not ready:
+                continue
+            chunk = os.read(self._master, 4096)
+            self.bytes_in += len(chunk)
+            self._parser.feed(chunk)
+            for frame in self._parser.frames():
+                self.frames_in += 1
+                reply = self.handle(frame)
+                if reply is not None:
+                    self._send(frame, reply)
+
+    def _send(self, frame: bytes, reply: bytes):
+        # 命令帧上线 + 驱动处理 + 应答帧上线，合并为一次 sleep 以减小定时误差
+        delay = self._wire_time(len(frame)) + self.reply_latency + self._wire_time(len(reply))
+        if delay > 0:
+            time.sleep(delay)
+        if self.rng.random() < self.drop_rate:
+            return
+        if self.rng.random() < self.corrupt_rate:
+            reply = bytearray(reply)
+            reply[self.rng.randrange(len(reply))] ^= 1 << self.rng.randrange(8)
+            reply = bytes(reply)
+        if self.rng.random() < self.garbage_rate:
+            reply = bytes(self.rng.randrange(256) for _ in range(self.rng.randint(1, 8))) + reply
+        os.write(self._master, reply)
+        self.frames_out += 1
+        self.bytes_out += len(reply)
+
+    def process(self, data: bytes) -> bytes:
+        """
+        进程内处理主机写出的字节，返回拼接后的应答字节（不经 pty，不模拟线上耗时与误码），
+        供 LoopbackTransport / GatewayServer 使用
+        """
+        self._advance()
+        self.bytes_in += len(data)
+        self._direct_parser.feed(data)
+        replies = []
+        for frame in self._direct_parser.frames():
+            self.frames_in += 1
+            reply = self.handle(frame)
+            if reply is not None:
+                replies.append(reply)
+        reply = b''.join(replies)
+        self.frames_out += len(replies)
+        self.bytes_out += len(reply)
+        return reply
+
+    def handle(self, frame: bytes):
+        """处理一条命令帧，返回应答帧（不应答时返回 None）"""
+        cmd, motor_id = frame[1], frame[2]
+        motor = self.motors.get(motor_id)
+        if motor is None:
+            return None
+        data = frame[5:-1]
+        with self._lock:
+            payload = self._execute(motor, cmd, data)
+        if payload is None:
+            return None
+        if payload == b'':
+            return build_frame(cmd, motor_id)
+        return build_frame(cmd, motor_id, list(payload))
+
+    def _execute(self, motor: SimulatedMotor, cmd: int, data: bytes):
+        if cmd == 0x88:
+            motor.enabled = True
+            return b''
+        if cmd in (0x80, 0x81):
+            # 0x80 关闭电机，0x81 仅停止控制输出
+            if cmd == 0x80:
+                motor.enabled = False
+            motor.iq_cmd = 0.0
+            motor.mode = 'torque'
+            return b''
+        if cmd in (0x19, 0x93, 0x9B):
+            if cmd == 0x19:
+                motor.zero = motor.position
+            elif cmd == 0x9B:
+                motor.error_flags = 0
+            return b''
+        if cmd == 0x9A:
+            return STATUS1_STRUCT.pack(motor.temperature, int(motor.voltage * 100), 0 if motor.enabled else 1,
+                                       motor.error_flags)
+        if cmd == 0x9C:
+            return motor.status2_payload()
+        if cmd == 0x90:
+            return ENCODER_STRUCT.pack(motor.encoder, motor.encoder, 0)
+        if cmd == 0x92:
+            return ANGLE64_STRUCT.pack(motor.angle_raw)
+        if cmd == 0x94:
+            circle = int(((motor.position - motor.zero) % (2 * math.pi)) * 180.0 / math.pi * 100)
+            return struct.pack('<I', circle)
+        if cmd == 0x12:
+            return self._device_info(motor)
+        if cmd == 0x40:
+            return bytes([data[0]]) + motor.params.get(data[0], bytes(6))
+        if cmd in (0x42, 0x44):
+            motor.params[data[0]] = bytes(data[1:7])
+            return bytes(data)
+        if 0xA0 <= cmd <= 0xA8:
+            self._closed_loop(motor, cmd, data, self.mit_a8)
+            return motor.status2_payload()
+        return None
+
+    @staticmethod
+    def _closed_loop(motor: SimulatedMotor, cmd: int, data: bytes, mit_a8: bool):
+        deg = math.pi / 180.0
+        if cmd == 0xA0:
+            motor.mode = 'torque'
+            motor.iq_cmd = PACK_I16.unpack_from(data)[0] / 850.0 * 33.0
+        elif cmd == 0xA1:
+            motor.mode = 'torque'
+            motor.iq_cmd = PACK_I16.unpack_from(data)[0] / IQ_RAW_PER_A
+        elif cmd == 0xA2:
+            motor.mode = 'speed'
+            motor.speed_cmd = PACK_I32.unpack_from(data)[0] / 1000.0 * deg
+        elif cmd in (0xA3, 0xA4):
+            motor.mode = 'position'
+            motor.position_cmd = motor.zero + PACK_I64.unpack_from(data)[0] / 100.0 * deg / 10.0
+        elif cmd in (0xA5, 0xA6):
+            motor.mode = 'position'
+            target = struct.unpack_from('<H', data, 1)[0] / 100.0 * deg
+            turns = math.floor((motor.position - motor.zero) / (2 * math.pi))
+            motor.position_cmd = motor.zero + turns * 2 * math.pi + target
+        elif cmd == 0xA7 or (cmd == 0xA8 and not mit_a8):
+            motor.mode = 'position'
+            motor.position_cmd = motor.position + PACK_I32.unpack_from(data)[0] / 100.0 * deg / 10.0
+        elif cmd == 0xA8:
+            # 本仓库以 0xA8 承载 MIT 控制负载：按 encode_mit_payload 的位布局解码
+            q = (data[0] << 8) | data[1]
+            dq = (data[2] << 4) | (data[3] >> 4)
+            kp = ((data[3] & 0xF) << 8) | data[4]
+            kd = (data[5] << 4) | (data[6] >> 4)
+            tau = ((data[6] & 0xF) << 8) | data[7]
+            q_des = (q / 65535.0 * 2 - 1) * MIT_Q_MAX
+            dq_des = (dq / 4095.0 * 2 - 1) * MIT_DQ_MAX / 100.0
+            kp = kp / 4095.0 * MIT_KP_MAX
+            kd = kd / 4095.0 * MIT_KD_MAX
+            iq_ff = (tau / 4095.0 * 2 - 1) * MIT_IQ_MAX
+            q_now = motor.position - motor.zero
+            motor.mode = 'torque'
+            motor.iq_cmd = kp * (q_des - q_now) + kd * (dq_des - motor.velocity) + iq_ff
+
+    @staticmethod
+    def _device_info(motor: SimulatedMotor) -> bytes:
+        def field(text: str, size: int) -> bytes:
+            return text.encode('ascii')[:size].ljust(size, b'\x00')
+        return (field("LK-SIM-DRIVER", 20) + field("LK-SIM-MOTOR", 20) + field(f"SIM{motor.motor_id:03d}", 12)
+                + struct.pack('<HHH', 10, 10, 10))
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="瓴控电机 pty 仿真端点")
+    parser.add_argument("--ids", type=int, nargs="+", default=[1])
+    parser.add_argument("--baudrate", type=int, default=460800)
+    parser.add_argument("--latency", type=float, default=0.0002, help="应答处理延迟（秒）")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="应答字节损坏概率")
+    parser.add_argument("--drop", type=float, default=0.0, help="应答丢失概率")
+    args = parser.parse_args()
+
+    sim = SimulatedBus(args.ids, baudrate=args.baudrate, reply_latency=args.latency,
+                       corrupt_rate=args.corrupt, drop_rate=args.drop)
+    sim.start()
+    print(f"仿真串口: {sim.port}  电机 ID: {args.ids}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sim.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import math
+import time
+from motor.protocol import *
+
+# 原始值 → 工程单位（与驱动标定一致）
+ANGLE_RAW_TO_RAD = math.pi / 180.0 / 100.0 / 10.0   # 0x92 多圈角度
+SPEED_RAW_TO_RAD_S = math.pi / 180.0 / 10.0         # 状态2 速度
+IQ_RAW_TO_A = 33.0 / 2048.0                         # 状态2 iq → 电流，A
+IQ_RAW_TO_NM = IQ_RAW_TO_A * 0.09 * 10              # 状态2 iq → 力矩
+ENCODER_RANGE = 1 << 16                             # 16 位单圈编码器
+ENCODER_REV_RAW = 36000                             # 编码器一圈对应的 0x92 原始值（0.01°/LSB）
+
+
+class EncoderTracker:
+    """
+    由状态2中的 16 位编码器值软件展开多圈位置，使 refresh 省去 0x92 读取：
+    - 以一次 0x92 应答为基准，此后每条状态2应答（0x9C 或闭环命令应答）按编码器增量累加
+    - 每隔 resync_period 秒需要重新读取一次 0x92 校正累积误差，drift 记录上次校正时的偏差（原始值）
+    - velocity: "driver" 使用驱动上报的速度；"diff" 由展开后的位置差分；"filtered" 为差分后一阶低通（系数 alpha）
+    相邻两次采样间隔较长（如丢帧）时，按驱动上报的速度推算应转过的圈数来消除整圈歧义。
+    """
+    VELOCITY_MODES = ("driver", "diff", "filtered")
+
+    def __init__(self, resync_period: float = 1.0, velocity: str = "driver", alpha: float = 0.2,
+                 rev_raw: int = ENCODER_REV_RAW):
+        if velocity not in self.VELOCITY_MODES:
+            raise ValueError(f"未知的速度估计方式: {velocity}")
+        self.resync_period = resync_period
+        self.velocity = velocity
+        self.alpha = alpha
+        self.scale = rev_raw / ENCODER_RANGE
+        self.last_encoder = None
+        self.last_resync = None
+        self.drift = 0.0
+        self.resyncs = 0
+        self._speed = None
+
+    def due(self, now: float = None) -> bool:
+        """是否需要读取 0x92（尚未建立基准或已到校正时间）"""
+        if self.last_resync is None:
+            return True
+        return (time.perf_counter() if now is None else now) - self.last_resync >= self.resync_period
+
+    def on_multi_turn(self, state, previous):
+        """收到 0x92：以其为新基准，记录与展开值的偏差"""
+        if previous is not None and self.last_resync is not None:
+            self.drift = previous - state.angle_raw
+        self.last_encoder = None
+        self.last_resync = state.angle_stamp
+        self.resyncs += 1
+
+    def on_status2(self, state, previous_stamp):
+        """收到状态2：按编码器增量推进多圈位置，并按需估计速度"""
+        encoder = state.encoder_value
+        last = self.last_encoder
+        self.last_encoder = encoder
+        if state.angle_raw is None:
+            return
+        if last is None:
+            # 刚以 0x92 建立基准：补上两次采样之间按驱动速度转过的角度
+            if self.last_resync is not None and state.angle_stamp == self.last_resync:
+                state.angle_raw += (state.speed_raw * SPEED_RAW_TO_RAD_S / ANGLE_RAW_TO_RAD
+                                    * (state.status_stamp - state.angle_stamp))
+                state.angle_stamp = state.status_stamp
+                state.angle_seq = state.status_seq
+            return
+        delta = ((encoder - last + 0x8000) & 0xFFFF) - 0x8000
+        dt = 0.0 if previous_stamp is None else state.status_stamp - previous_stamp
+        if dt > 0:
+            # 驱动速度（此时仍为驱动上报值）折算的期望编码器增量，取与之最接近的整圈
+            expected = state.speed_raw * SPEED_RAW_TO_RAD_S / ANGLE_RAW_TO_RAD / self.scale * dt
+            delta += round((expected - delta) / ENCODER_RANGE) * ENCODER_RANGE
+        state.angle_raw += delta * self.scale
+        state.angle_stamp = state.status_stamp
+        state.angle_seq = state.status_seq
+        if self.velocity == "driver" or dt <= 0:
+            return
+        speed = delta * self.scale * ANGLE_RAW_TO_RAD / dt / SPEED_RAW_TO_RAD_S
+        if self.velocity == "filtered" and self._speed is not None:
+            speed = self._speed + self.alpha * (speed - self._speed)
+        self._speed = speed
+        state.speed_raw = speed
+
+
+class MotorState:
+    """
+    每个电机一份、原地更新的状态记录。
+    应答帧直接用 unpack_from 解码为原始整数，弧度 / 弧度每秒 / Nm 在访问属性时才换算；
+    尚未收到对应应答时属性为 None。
+    每类测量带有采集时刻（time.perf_counter()，收到应答时）与序号：
+    0x92 多圈角度记在 angle_stamp / angle_seq，状态2（速度、力矩等）记在 status_stamp / status_seq，
+    序号取自本状态的全局计数 seq，可据此判断两次测量的先后。
+    查询最终超时后 stale_since 记录首次失败的时刻，下一次成功更新时清除。
+    """
+    __slots__ = ('angle_raw', 'temperature', 'iq_raw', 'speed_raw', 'encoder_value', 'stale_since',
+                 'angle_stamp', 'angle_seq', 'status_stamp', 'status_seq', 'seq', 'tracker')
+
+    def __init__(self):
+        self.angle_raw = None      # 多圈角度原始值（0x92）
+        self.temperature = None    # 温度，℃
+        self.iq_raw = None         # iq 原始值（-2048~2048 对应 -33A~33A）
+        self.speed_raw = None      # 速度原始值
+        self.encoder_value = None  # 单圈编码器值
+        self.stale_since = None    # 过期起始时刻；None 表示数据为最新
+        self.angle_stamp = None    # 多圈角度的采集时刻
+        self.angle_seq = 0
+        self.status_stamp = None   # 状态2 的采集时刻
+        self.status_seq = 0
+        self.seq = 0               # 测量总序号
+        self.tracker = None        # 可选的 EncoderTracker（软件多圈展开）
+
+    def update_status2(self, buf, offset: int = 5, stamp: float = None):
+        """从状态2格式的应答帧（0x9C 或闭环命令应答）更新；stamp 缺省为当前时刻"""
+        previous_stamp = self.status_stamp
+        (self.temperature, self.iq_raw, self.speed_raw,
+         self.encoder_value) = STATUS2_STRUCT.unpack_from(buf, offset)
+        self.status_stamp = time.perf_counter() if stamp is None else stamp
+        self.seq += 1
+        self.status_seq = self.seq
+        self.stale_since = None
+        if self.tracker is not None:
+            self.tracker.on_status2(self, previous_stamp)
+        return self
+
+    def update_multi_turn(self, buf, offset: int = 5, stamp: float = None):
+        """从 0x92 多圈角度应答帧更新；stamp 缺省为当前时刻"""
+        previous = self.angle_raw
+        self.angle_raw = ANGLE64_STRUCT.unpack_from(buf, offset)[0]
+        self.angle_stamp = time.perf_counter() if stamp is None else stamp
+        self.seq += 1
+        self.angle_seq = self.seq
+        self.stale_since = None
+        if self.tracker is not None:
+            self.tracker.on_multi_turn(self, previous)
+        return self
+
+    def needs_multi_turn(self) -> bool:
+        """本轮刷新是否需要读取 0x92（未启用软件展开，或需要建立/校正基准）"""
+        return self.tracker is None or self.tracker.due()
+
+    def mark_stale(self):
+        """应答丢失：保留旧值，但标记为过期"""
+        if self.stale_since is None:
+            self.stale_since = time.perf_counter()
+
+    @property
+    def stale(self) -> bool:
+        return self.stale_since is not None
+
+    @property
+    def stamp(self):
+        """位置与速度中较旧一份的采集时刻；任一尚未采集时为 None"""
+        if self.angle_stamp is None or self.status_stamp is None:
+            return None
+        return min(self.angle_stamp, self.status_stamp)
+
+    def age(self, now: float = None) -> float:
+        """最旧一份测量距今的时间（秒）；尚未采集齐时为 inf"""
+        stamp = self.stamp
+        if stamp is None:
+            return math.inf
+        return (time.perf_counter() if now is None else now) - stamp
+
+    def position_age(self, now: float = None) -> float:
+        if self.angle_stamp is None:
+            return math.inf
+        return (time.perf_counter() if now is None else now) - self.angle_stamp
+
+    def velocity_age(self, now: float = None) -> float:
+        if self.status_stamp is None:
+            return math.inf
+        return (time.perf_counter() if now is None else now) - self.status_stamp
+
+    @property
+    def position(self):
+        """多圈角度，弧度"""
+        return None if self.angle_raw is None else self.angle_raw * ANGLE_RAW_TO_RAD
+
+    @property
+    def velocity(self):
+        """速度，弧度/s"""
+        return None if self.speed_raw is None else self.speed_raw * SPEED_RAW_TO_RAD_S
+
+    @property
+    def torque(self):
+        """由 iq 估算的力矩，Nm"""
+        return None if self.iq_raw is None else self.iq_raw * IQ_RAW_TO_NM
+
+    # 兼容原先 status dict 的键名
+    @property
+    def iq_or_power(self):
+        return self.iq_raw
+
+    @property
+    def speed_dps(self):
+        return self.speed_raw
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __repr__(self):
+        return (f"MotorState(position={self.position}, velocity={self.velocity}, "
+                f"torque={self.torque}, temperature={self.temperature}, encoder_value={self.encoder_value})")
@@ -0,0 +1,166 @@
+class LatencyHistogram:
+    """
+    定宽分桶的耗时直方图（单位：秒），记录为 O(1)，可随时查询分位数。
+    - resolution: 桶宽，默认 10 µs
+    - max_value: 覆盖范围上限，超出的样本计入最后一个桶（max 仍精确记录）
+    """
+    def __init__(self, resolution: float = 1e-5, max_value: float = 0.1):
+        self.resolution = resolution
+        self.bins = [0] * (int(max_value / resolution) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.top = 0  # 最高非空桶的下标，查询只需遍历到此
+
+    def record(self, value: float):
+        index = int(value / self.resolution)
+        if index < 0:
+            index = 0
+        elif index >= len(self.bins):
+            index = len(self.bins) - 1
+        self.bins[index] += 1
+        if index > self.top:
+            self.top = index
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """第 p 百分位（0~100），返回所在桶的上沿"""
+        return self.percentiles((p,))[0]
+
+    def percentiles(self, ps) -> list[float]:
+        """
+        一次遍历求多个百分位（ps 须升序）；只遍历到最高非空桶，
+        耗时取决于实际最大值而非直方图范围
+        """
+        if self.count == 0:
+            return [0.0] * len(ps)
+        result = []
+        targets = iter(ps)
+        target = self.count * next(targets) / 100.0
+        seen = 0
+        bins = self.bins
+        for index in range(self.top + 1):
+            n = bins[index]
+            if not n:
+                continue
+            seen += n
+            while seen >= target:
+                result.append(min((index + 1) * self.resolution, self.max))
+                p = next(targets, None)
+                if p is None:
+                    return result
+                target = self.count * p / 100.0
+        return result + [self.max] * (len(ps) - len(result))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        p50, p99 = self.percentiles((50, 99))
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": p50,
+            "p99": p99,
+            "max": self.max,
+        }
+
+    def reset(self):
+        self.bins = [0] * len(self.bins)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.top = 0
+
+
+class CommandStats:
+    """单个（电机 ID, 命令）的计数器与往返耗时直方图"""
+    __slots__ = ('requests', 'replies', 'timeouts', 'header_errors', 'checksum_errors', 'retries',
+                 'bytes_sent', 'bytes_received', 'latency')
+
+    def __init__(self):
+        self.requests = 0
+        self.replies = 0
+        self.timeouts = 0
+        self.header_errors = 0    # 等待该命令应答期间解析器丢弃的非法字节数
+        self.checksum_errors = 0  # 等待该命令应答期间数据校验失败的帧数
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram(resolution=2e-5, max_value=0.05)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "replies": self.replies,
+            "timeouts": self.timeouts,
+            "header_errors": self.header_errors,
+            "checksum_errors": self.checksum_errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.summary(),
+        }
+
+
+class BusStats:
+    """
+    一条总线上按（电机 ID, 命令）分类的收发统计。
+    计数在事务路径上只是几次属性自增与一次直方图记录，可在 1 kHz 控制循环中常开。
+    """
+    _COUNTERS = ('requests', 'replies', 'timeouts', 'header_errors', 'checksum_errors', 'retries',
+                 'bytes_sent', 'bytes_received')
+
+    def __init__(self, port: str = None):
+        self.port = port
+        self.commands = {}
+
+    def get(self, motor_id: int, cmd: int) -> CommandStats:
+        key = (motor_id, cmd)
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = CommandStats()
+        return stats
+
+    def reset(self):
+        self.commands = {}
+
+    def snapshot(self, motor_id: int = None) -> dict:
+        """{motor_id: {"0x9c": {...}}}；指定 motor_id 时只返回该电机"""
+        result = {}
+        for (mid, cmd), stats in sorted(self.commands.items()):
+            if motor_id is not None and mid != motor_id:
+                continue
+            result.setdefault(mid, {})[f"0x{cmd:02x}"] = stats.summary()
+        return result
+
+    def to_json(self, motor_id: int = None) -> str:
+        import json
+        return json.dumps({"port": self.port, "motors": self.snapshot(motor_id)}, indent=2)
+
+    def to_prometheus(self, prefix: str = "lk_motor") -> str:
+        """Prometheus 文本格式导出"""
+        lines = []
+        items = sorted(self.commands.items())
+
+        def labels(mid, cmd, extra=""):
+            return f'{{port="{self.port}",motor_id="{mid}",cmd="0x{cmd:02x}"{extra}}}'
+
+        for name in self._COUNTERS:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for (mid, cmd), stats in items:
+                lines.append(f"{prefix}_{name}_total{labels(mid, cmd)} {getattr(stats, name)}")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for (mid, cmd), stats in items:
+            hist = stats.latency
+            quantiles = (0.5, 0.9, 0.99)
+            for q, value in zip(quantiles, hist.percentiles([q * 100 for q in quantiles])):
+                quantile = ',quantile="%g"' % q
+                lines.append(f"{prefix}_latency_seconds{labels(mid, cmd, quantile)} {value:.6f}")
+            lines.append(f"{prefix}_latency_seconds_sum{labels(mid, cmd)} {hist.total:.6f}")
+            lines.append(f"{prefix}_latency_seconds_count{labels(mid, cmd)} {hist.count}")
+        return "\n".join(lines) + "\n"
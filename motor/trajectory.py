@@ -0,0 +1,180 @@
+"""
+轨迹预计算与定频下发：
+先把最小加加速度 / 梯形速度 / 三次样条轨迹一次性算成 (T, N) 数组（单位 °，T 为拍数，N 为关节数），
+再按总线预编码为连续的帧缓冲区，下发时每拍只需移动下标并写出一段切片。
+
+    traj = min_jerk([0, 0], [90, -45], duration=2.0, rate_hz=1000)
+    TrajectoryStreamer(group, ["j1", "j2"], traj).run()
+"""
+import time
+from motor.protocol import *
+from motor.protocol import np, _require_numpy
+from motor.loop import LoopRunner
+
+
+class Trajectory:
+    """
+    定频采样的多关节轨迹：positions 为 (T, N) 数组，单位 °（与 move_to_position 一致）
+    """
+    def __init__(self, positions, rate_hz: float):
+        _require_numpy()
+        positions = np.asarray(positions, dtype=np.float64)
+        self.positions = positions.reshape(len(positions), -1)
+        self.rate_hz = rate_hz
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def duration(self) -> float:
+        return (len(self.positions) - 1) / self.rate_hz
+
+    @property
+    def velocities(self):
+        """(T, N) 速度，°/s（数值差分）"""
+        if len(self.positions) < 2:
+            return np.zeros_like(self.positions)
+        return np.gradient(self.positions, 1.0 / self.rate_hz, axis=0)
+
+
+def _time_base(duration: float, rate_hz: float):
+    n = max(int(round(duration * rate_hz)), 1) + 1
+    return np.linspace(0.0, 1.0, n)
+
+
+def min_jerk(start, end, duration: float, rate_hz: float) -> Trajectory:
+    """最小加加速度轨迹：s(τ) = 10τ³ − 15τ⁴ + 6τ⁵，起止速度与加速度均为 0"""
+    _require_numpy()
+    start = np.atleast_1d(np.asarray(start, dtype=np.float64))
+    end = np.atleast_1d(np.asarray(end, dtype=np.float64))
+    tau = _time_base(duration, rate_hz)
+    s = tau ** 3 * (10.0 - 15.0 * tau + 6.0 * tau ** 2)
+    return Trajectory(start + np.outer(s, end - start), rate_hz)
+
+
+def trapezoidal(start, end, max_speed: float, max_accel: float, rate_hz: float) -> Trajectory:
+    """
+    梯形速度轨迹（°/s、°/s²）。各关节同步起止：以行程最长（最慢）的关节确定总时长与加速段，
+    其余关节按相同归一化曲线缩放，因而都不超过速度与加速度上限。
+    """
+    _require_numpy()
+    start = np.atleast_1d(np.asarray(start, dtype=np.float64))
+    end = np.atleast_1d(np.asarray(end, dtype=np.float64))
+    distance = float(np.max(np.abs(end - start))) if start.size else 0.0
+    if distance == 0.0:
+        return Trajectory(np.tile(start, (2, 1)), rate_hz)
+    if distance <= max_speed ** 2 / max_accel:
+        t_acc = (distance / max_accel) ** 0.5          # 三角形速度曲线
+        total = 2.0 * t_acc
+    else:
+        t_acc = max_speed / max_accel
+        total = distance / max_speed + t_acc
+    t = _time_base(total, rate_hz) * total
+    a = t_acc / total                                   # 归一化加速段占比
+    tau = t / total
+    # 归一化位移 s(τ)：加速段抛物线、匀速段线性、减速段对称
+    peak = 1.0 / (1.0 - a)                              # 归一化峰值速度
+    s = np.where(tau < a, 0.5 * peak / a * tau ** 2,
+                 np.where(tau <= 1.0 - a, peak * (tau - 0.5 * a),
+                          1.0 - 0.5 * peak / a * (1.0 - tau) ** 2))
+    return Trajectory(start + np.outer(s, end - start), rate_hz)
+
+
+def cubic_spline(waypoints, times, rate_hz: float) -> Trajectory:
+    """
+    过给定路点的三次样条（两端速度为 0）：
+    - waypoints: (K, N) 路点，°
+    - times: (K,) 递增的路点时刻，s（首个通常为 0）
+    """
+    _require_numpy()
+    y = np.asarray(waypoints, dtype=np.float64)
+    y = y.reshape(len(y), -1)
+    x = np.asarray(times, dtype=np.float64)
+    k = len(x)
+    if k < 2 or len(y) != k:
+        raise ValueError("路点与时刻数量需一致且至少为 2")
+    h = np.diff(x)
+    if np.any(h <= 0):
+        raise ValueError("路点时刻必须严格递增")
+    # 求各路点二阶导 M（固定端点一阶导为 0 的三对角方程组）
+    a = np.zeros((k, k))
+    rhs = np.zeros((k, y.shape[1]))
+    slope = np.diff(y, axis=0) / h[:, None]
+    a[0, 0], a[0, 1] = 2 * h[0], h[0]
+    rhs[0] = 6 * slope[0]
+    a[-1, -2], a[-1, -1] = h[-1], 2 * h[-1]
+    rhs[-1] = -6 * slope[-1]
+    for i in range(1, k - 1):
+        a[i, i - 1], a[i, i], a[i, i + 1] = h[i - 1], 2 * (h[i - 1] + h[i]), h[i]
+        rhs[i] = 6 * (slope[i] - slope[i - 1])
+    m = np.linalg.solve(a, rhs)
+
+    t = _time_base(x[-1] - x[0], rate_hz) * (x[-1] - x[0]) + x[0]
+    seg = np.clip(np.searchsorted(x, t, side="right") - 1, 0, k - 2)
+    x0, hs = x[seg], h[seg]
+    d0 = (t - x0)[:, None]
+    d1 = (x[seg + 1] - t)[:, None]
+    hs = hs[:, None]
+    positions = (m[seg] * d1 ** 3 + m[seg + 1] * d0 ** 3) / (6 * hs) \
+        + (y[seg] / hs - m[seg] * hs / 6) * d1 + (y[seg + 1] / hs - m[seg + 1] * hs / 6) * d0
+    return Trajectory(positions, rate_hz)
+
+
+class TrajectoryStreamer:
+    """
+    把 Trajectory 预编码为各总线的帧缓冲区，并经 MotorGroup 中电机所在的总线定频下发：
+    - command="position": 0xA3 多圈位置（°）
+    - command="speed": 0xA2 速度（°/s，由轨迹差分得到）
+    每拍只做下标递增与一次连发写出；观测模式的电机按应答更新状态。
+    """
+    COMMANDS = {"position": 0xA3, "speed": 0xA2}
+
+    def __init__(self, group, names, trajectory: Trajectory, command: str = "position"):
+        if command not in self.COMMANDS:
+            raise ValueError(f"未知的轨迹命令: {command}")
+        if trajectory.positions.shape[1] != len(names):
+            raise ValueError(f"轨迹关节数 {trajectory.positions.shape[1]} 与电机数 {len(names)} 不一致")
+        self.group = group
+        self.names = tuple(names)
+        self.trajectory = trajectory
+        self.cmd = self.COMMANDS[command]
+        values = trajectory.positions if command == "position" else trajectory.velocities
+        encode = encode_position_batch if command == "position" else encode_speed_batch
+        self.index = 0
+        self.plans = []
+        ticks = len(trajectory)
+        for bus, motor_ids, columns, motors in group._plan(self.names):
+            # 所有拍、本总线所有电机的帧首尾相连：第 i 拍即第 i 段
+            buf = memoryview(encode(np.tile(motor_ids, ticks), values[:, columns].ravel()))
+            reply_len = 13 if any(motor.observe for motor in motors) else 0
+            self.plans.append((bus, motor_ids, motors, buf, len(buf) // ticks, reply_len))
+
+    def __len__(self):
+        return len(self.trajectory)
+
+    @property
+    def done(self) -> bool:
+        return self.index >= len(self.trajectory)
+
+    def reset(self):
+        self.index = 0
+
+    def step(self) -> bool:
+        """下发当前一拍；轨迹已结束时返回 False"""
+        i = self.index
+        if i >= len(self.trajectory):
+            return False
+        for bus, motor_ids, motors, buf, size, reply_len in self.plans:
+            start = time.perf_counter()
+            replies = bus.transact_burst(buf[i * size:(i + 1) * size], self.cmd, motor_ids, reply_len)
+            self.group._apply_burst_replies(motors, replies, self.cmd, time.perf_counter() - start)
+        self.index = i + 1
+        return True
+
+    def run(self, rate_hz: float = None) -> LoopRunner:
+        """以轨迹采样频率（或 rate_hz）从当前位置播放到结束，返回 LoopRunner 以便查询统计"""
+        runner = LoopRunner(self.step, rate_hz or self.trajectory.rate_hz)
+        remaining = len(self.trajectory) - self.index
+        if remaining > 0:
+            runner.run(max_ticks=remaining)
+        return runner
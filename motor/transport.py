@@ -0,0 +1,467 @@
+"""
+可插拔的字节传输层。LkBus 只依赖 pyserial 的一个子集：
+write / read / in_waiting / reset_input_buffer / baudrate / timeout / is_open / open / close，
+凡实现这些的对象都可作为总线的传输，帧的编码与解析（build_frame、FrameParser）与传输无关。
+
+open_transport() 按地址选择实现：
+- "/dev/ttyUSB0"、"COM3"：本地串口（pyserial，或 backend="posix" 使用 termios 低延迟后端）
+- "tcp://host:port"：TCP 串口服务器（透明传输）
+- "udp://host:port"：UDP 串口服务器，一个批次的请求合并为一个数据报
+- "replay://capture.lkcap"：按原始时序回放 CaptureTransport 抓取的字节流
+- "loop://"：进程内回环（回显写出的字节）
+
+    bus = LkBus("tcp://192.168.1.50:4001")
+    sim = SimulatedBus([1, 2])
+    bus = LkBus(LoopbackTransport(sim))         # 不经 pty 直接与仿真器对话
+"""
+import select
+import socket
+import struct
+import threading
+import time
+
+# 抓包文件：文件头 魔数 | 版本；每条记录 时间戳(s, 相对抓包开始) | 方向 | 字节数，后接数据
+CAPTURE_MAGIC = b'LKCP'
+CAPTURE_HEADER = struct.Struct('<4sH')
+CAPTURE_RECORD = struct.Struct('<dBI')
+TX = 0
+RX = 1
+
+
+class Transport:
+    """
+    非串口传输的基类：维护接收缓冲区与请求批次，子类只需实现 _send(data) 与 _receive(timeout)。
+    - baudrate: 远端串口的波特率，仅用于 LkBus.wire_time() 估算线上耗时
+    - timeout: 单次 read 的最长等待时间（秒）
+    批次：begin_batch() 与 end_batch() 之间写出的字节暂存，在批次结束或下一次 read 时一次发出，
+    用于把多条请求合并为一次网络发送（见 LkBus.batch()）。
+    """
+    name = "transport"
+
+    def __init__(self, baudrate: int = 460800, timeout: float = 0.001):
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._rx = bytearray()
+        self._tx = bytearray()
+        self._batch = 0
+        self._open = True
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def open(self):
+        pass
+
+    def fileno(self) -> int:
+        raise OSError(f"{self.name} 没有文件描述符")
+
+    def _send(self, data: bytes):
+        raise NotImplementedError
+
+    def _receive(self, timeout: float) -> bool:
+        """至多等待 timeout 秒，把到达的字节追加到 self._rx；有新数据时返回 True"""
+        raise NotImplementedError
+
+    def write(self, data) -> int:
+        self._tx += data
+        if not self._batch:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        """发出暂存的请求字节"""
+        if self._tx:
+            data = bytes(self._tx)
+            del self._tx[:]
+            self._send(data)
+
+    def begin_batch(self):
+        self._batch += 1
+
+    def end_batch(self):
+        self._batch -= 1
+        if not self._batch:
+            self.flush()
+
+    @property
+    def in_waiting(self) -> int:
+        self._receive(0.0)
+        return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        """读取至多 size 字节；timeout 秒内未凑齐时返回已收到的部分"""
+        self.flush()
+        rx = self._rx
+        if len(rx) < size:
+            deadline = time.perf_counter() + self.timeout
+            while len(rx) < size:
+                remaining = deadline - time.perf_counter()
+                if not self._receive(max(remaining, 0.0)) and remaining <= 0:
+                    break
+        data = bytes(rx[:size])
+        del rx[:size]
+        return data
+
+    def reset_input_buffer(self):
+        while self._receive(0.0):
+            pass
+        del self._rx[:]
+
+    def close(self):
+        self._open = False
+
+
+class TcpTransport(Transport):
+    """经 TCP 串口服务器（透明传输模式）访问总线；关闭 Nagle 以免小帧被延迟合并"""
+
+    def __init__(self, host: str, port: int, baudrate: int = 460800, timeout: float = 0.001,
+                 connect_timeout: float = 2.0):
+        super().__init__(baudrate, timeout)
+        self.name = f"tcp://{host}:{port}"
+        self.sock = socket.create_connection((host, port), timeout=connect_timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buf = bytearray(4096)
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def _send(self, data: bytes):
+        self.sock.sendall(data)
+
+    def _receive(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return False
+        n = self.sock.recv_into(self._buf)
+        if n == 0:
+            raise ConnectionError(f"{self.name} 连接已关闭")
+        self._rx += memoryview(self._buf)[:n]
+        return True
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+class UdpTransport(Transport):
+    """
+    经 UDP 串口服务器访问总线：每次 flush 的字节作为一个数据报发出（超过 max_datagram 时分片），
+    配合 LkBus.batch() 可把一个控制周期内的全部请求合并为一次网络发送。
+    """
+
+    def __init__(self, host: str, port: int, baudrate: int = 460800, timeout: float = 0.001,
+                 max_datagram: int = 1400):
+        super().__init__(baudrate, timeout)
+        self.name = f"udp://{host}:{port}"
+        self.max_datagram = max_datagram
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect((host, port))
+        self._buf = bytearray(65536)
+        self.datagrams_sent = 0
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def _send(self, data: bytes):
+        view = memoryview(data)
+        for offset in range(0, len(view), self.max_datagram):
+            self.sock.send(view[offset:offset + self.max_datagram])
+            self.datagrams_sent += 1
+
+    def _receive(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return False
+        n = self.sock.recv_into(self._buf)
+        self._rx += memoryview(self._buf)[:n]
+        return True
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+def _device_handler(device):
+    """
+    把回环设备统一为 handler(bytes) -> bytes：
+    具有 process() 的对象（如 SimulatedBus）、可调用对象，或 None（回显）
+    """
+    if device is None:
+        return bytes
+    process = getattr(device, "process", None)
+    return process if process is not None else device
+
+
+class LoopbackTransport(Transport):
+    """
+    进程内回环：写出的字节立即交给 device 处理，其返回的应答字节进入接收缓冲区。
+    device 为 SimulatedBus 时即为不经 pty、无线上耗时的仿真总线；为 None 时回显。
+    """
+
+    def __init__(self, device=None, baudrate: int = 460800, timeout: float = 0.001):
+        super().__init__(baudrate, timeout)
+        self.name = "loop://"
+        self.handler = _device_handler(device)
+        self._lock = threading.Lock()
+
+    def _send(self, data: bytes):
+        reply = self.handler(data)
+        if reply:
+            with self._lock:
+                self._rx += reply
+
+    def _receive(self, timeout: float) -> bool:
+        # 应答在 _send 中同步产生，没有待到达的数据；模拟串口的等待语义
+        if timeout > 0:
+            time.sleep(timeout)
+        return False
+
+
+class CaptureTransport:
+    """
+    包装任一传输，把收发字节连同时间戳写入抓包文件，供 ReplayTransport 回放。
+    其余属性与方法透传给被包装的传输。
+    """
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.name = f"capture:{getattr(inner, 'name', getattr(inner, 'port', 'serial'))}"
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, 1))
+        self._start = time.perf_counter()
+
+    def __str__(self):
+        return self.name
+
+    def __getattr__(self, item):
+        return getattr(self.inner, item)
+
+    @property
+    def baudrate(self) -> int:
+        return self.inner.baudrate
+
+    @baudrate.setter
+    def baudrate(self, baudrate: int):
+        self.inner.baudrate = baudrate
+
+    def _record(self, direction: int, data: bytes):
+        self._file.write(CAPTURE_RECORD.pack(time.perf_counter() - self._start, direction, len(data)))
+        self._file.write(data)
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._record(TX, data)
+        return self.inner.write(data)
+
+    def read(self, size: int = 1) -> bytes:
+        data = self.inner.read(size)
+        if data:
+            self._record(RX, data)
+        return data
+
+    def read_view(self, size: int = 1):
+        """LkBus 优先调用 read_view；显式定义以免经 __getattr__ 绕过记录"""
+        read_view = getattr(self.inner, "read_view", None)
+        data = read_view(size) if read_view is not None else self.inner.read(size)
+        if data:
+            self._record(RX, data)
+        return data
+
+    def reset_input_buffer(self):
+        """丢弃前先把已到达的字节记入抓包，回放时的字节流与时序才与原始一致"""
+        waiting = self.inner.in_waiting
+        if waiting:
+            self.read(waiting)
+        self.inner.reset_input_buffer()
+
+    def close(self):
+        self._file.close()
+        self.inner.close()
+
+
+def load_capture(path: str) -> list[tuple[float, int, bytes]]:
+    """读取抓包文件为 [(时间戳, 方向, 数据)]"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    magic, version = CAPTURE_HEADER.unpack_from(blob, 0)
+    if magic != CAPTURE_MAGIC:
+        raise ValueError(f"{path} 不是抓包文件")
+    records = []
+    offset = CAPTURE_HEADER.size
+    while offset + CAPTURE_RECORD.size <= len(blob):
+        stamp, direction, n = CAPTURE_RECORD.unpack_from(blob, offset)
+        offset += CAPTURE_RECORD.size
+        records.append((stamp, direction, blob[offset:offset + n]))
+        offset += n
+    return records
+
+
+class ReplayTransport(Transport):
+    """
+    回放抓包：主机每次写出时消费抓包中对应的发送记录，其后的接收记录按抓包中相对该次发送的时延
+    （除以 speed）依次到达；realtime=False 时应答立即可读。
+    回放假定主机按抓包时的顺序发出相同的请求，写出字节与抓包不一致的次数计入 self.mismatches。
+    """
+
+    def __init__(self, path: str, baudrate: int = 460800, timeout: float = 0.001, realtime: bool = True,
+                 speed: float = 1.0):
+        super().__init__(baudrate, timeout)
+        self.name = f"replay://{path}"
+        self.records = load_capture(path)
+        self.realtime = realtime
+        self.speed = speed
+        self.mismatches = 0
+        self._index = 0
+        # (主机时刻, 抓包时刻) 对齐点：接收记录在 主机时刻 + (记录时刻 − 抓包时刻) / speed 到达
+        self._anchor = (time.perf_counter(), 0.0)
+
+    @property
+    def done(self) -> bool:
+        return self._index >= len(self.records)
+
+    def _send(self, data: bytes):
+        records = self.records
+        expected = bytearray()
+        stamp = None
+        while self._index < len(records) and len(expected) < len(data):
+            t, direction, chunk = records[self._index]
+            if direction == TX:
+                expected += chunk
+                stamp = t
+            self._index += 1  # 主机写出前尚未读取的接收记录随之跳过
+        if bytes(expected) != data:
+            self.mismatches += 1
+        if stamp is not None:
+            self._anchor = (time.perf_counter(), stamp)
+
+    def _receive(self, timeout: float) -> bool:
+        records = self.records
+        if self._index < len(records) and records[self._index][1] == RX:
+            t, _, chunk = records[self._index]
+            due = self._anchor[0] + (t - self._anchor[1]) / self.speed if self.realtime else 0.0
+            wait = due - time.perf_counter()
+            if wait <= timeout:
+                if wait > 0:
+                    time.sleep(wait)
+                self._rx += chunk
+                self._index += 1
+                return True
+        if timeout > 0:
+            time.sleep(timeout)
+        return False
+
+
+def open_transport(port, baudrate: int = 460800, timeout: float = 0.001, backend: str = "pyserial"):
+    """
+    按地址打开传输（见模块说明）；port 已是传输对象时原样返回。
+    - backend: 本地串口的实现，"pyserial" 或 "posix"
+    """
+    if not isinstance(port, str):
+        return port
+    scheme, sep, rest = port.partition("://")
+    if not sep:
+        if backend == "posix":
+            from motor.posix_serial import PosixSerial
+            return PosixSerial(port, baudrate, timeout=timeout)
+        if backend == "pyserial":
+            import serial
+            return serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
+        raise ValueError(f"未知的串口后端: {backend}")
+    if scheme in ("tcp", "udp"):
+        host, _, number = rest.rpartition(":")
+        cls = TcpTransport if scheme == "tcp" else UdpTransport
+        return cls(host, int(number), baudrate, timeout)
+    if scheme == "replay":
+        return ReplayTransport(rest, baudrate, timeout)
+    if scheme == "loop":
+        return LoopbackTransport(None, baudrate, timeout)
+    raise ValueError(f"未知的传输地址: {port}")
+
+
+class GatewayServer:
+    """
+    本地串口服务器替身：在 TCP 或 UDP 端口上接收字节，交给 device（如 SimulatedBus）处理并回送应答，
+    用于在无硬件、无网关时测试 TcpTransport / UdpTransport。
+
+        sim = SimulatedBus([1])
+        with GatewayServer(sim, "udp") as gw:
+            motor = LkMotor(gw.url, motor_id=1)
+    """
+
+    def __init__(self, device=None, kind: str = "tcp", host: str = "127.0.0.1", port: int = 0):
+        if kind not in ("tcp", "udp"):
+            raise ValueError(f"未知的网关类型: {kind}")
+        self.kind = kind
+        self.handler = _device_handler(device)
+        sock_type = socket.SOCK_STREAM if kind == "tcp" else socket.SOCK_DGRAM
+        self.sock = socket.socket(socket.AF_INET, sock_type)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        if kind == "tcp":
+            self.sock.listen(1)
+        self.address = self.sock.getsockname()
+        self.url = f"{kind}://{self.address[0]}:{self.address[1]}"
+        self.datagrams_received = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        target = self._serve_tcp if self.kind == "tcp" else self._serve_udp
+        self._thread = threading.Thread(target=target, name=f"lk-gateway-{self.kind}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve_tcp(self):
+        while self._running:
+            ready, _, _ = select.select([self.sock], [], [], 0.05)
+            if not ready:
+                continue
+            conn, _ = self.sock.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with conn:
+                while self._running:
+                    ready, _, _ = select.select([conn], [], [], 0.05)
+                    if not ready:
+                        continue
+                    try:
+                        data = conn.recv(4096)
+                    except ConnectionError:
+                        break
+                    if not data:
+                        break
+                    reply = self.handler(data)
+                    if reply:
+                        conn.sendall(reply)
+
+    def _serve_udp(self):
+        while self._running:
+            ready, _, _ = select.select([self.sock], [], [], 0.05)
+            if not ready:
+                continue
+            data, peer = self.sock.recvfrom(65536)
+            self.datagrams_received += 1
+            reply = self.handler(data)
+            if reply:
+                self.sock.sendto(reply, peer)
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,4 +1,5 @@
 from motor.motor import LkMotor
+from motor.discovery import discover, COMMON_BAUDRATES
 import time
 
 def read_motor_info(port: str):
@@ -18,18 +19,21 @@ def read_motor_info(port: str):
     except Exception as e:
         print(f"读取失败: {e}")
 
-def scan_motor_ids(port: str):
-    print("正在扫描电机 ID（1~10）...")
-    for i in range(1, 11):
-        try:
-            motor = LkMotor(port=port, motor_id=i)
-            motor.refresh()
-            if motor.position is not None:
-                print(f"ID={i}：角度={motor.position:.2f} rad  速度={motor.velocity:.2f} rad/s  扭矩={motor.torque:.2f}")
-            else:
-                print(f"ID={i}：连接成功但未返回状态数据")
-        except Exception as e:
-            print(f"ID={i} 无响应: {e}")
+def scan_motor_ids(port: str, sweep_baudrates: bool = False, pipelined: bool = True):
+    print("正在扫描电机 ID（1~32）...")
+    start = time.perf_counter()
+    found = discover(port, COMMON_BAUDRATES if sweep_baudrates else None, pipelined=pipelined)
+    elapsed = time.perf_counter() - start
+    if not found:
+        print(f"未发现电机（用时 {elapsed:.2f} s）")
+        return
+    for motor_id, info in sorted(found.items()):
+        if "driver_name" in info:
+            print(f"ID={motor_id}：波特率={info['baudrate']}  驱动={info['driver_name']}  电机={info['motor_name']}  "
+                  f"固件版本={info['firmware_version'] / 10:.1f}")
+        else:
+            print(f"ID={motor_id}：波特率={info['baudrate']}  设备信息读取失败: {info.get('error')}")
+    print(f"共发现 {len(found)} 个电机（用时 {elapsed:.2f} s）")
 
 def main():
     print("=== LK Motor 工具菜单 ===")
@@ -40,8 +44,9 @@ def main():
     while True:
         print("\n请选择操作:")
         print("1. 读取电机信息（驱动型号 / 电机型号 / 版本）")
-        print("2. 扫描当前串口下的电机 ID（读取状态）")
-        print("3. 退出")
+        print("2. 扫描当前串口下的电机 ID（1~32）")
+        print("3. 扫描电机 ID 并遍历常用波特率")
+        print("4. 退出")
 
         choice = input("请输入操作编号：").strip()
         if choice == "1":
@@ -49,6 +54,8 @@ def main():
         elif choice == "2":
             scan_motor_ids(port)
         elif choice == "3":
+            scan_motor_ids(port, sweep_baudrates=True)
+        elif choice == "4":
             print("再见！")
             break
         else:
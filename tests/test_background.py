@@ -0,0 +1,30 @@
+from motor.background import BackgroundPoller
+from motor.bus import LkBus
+from motor.controller import MITController
+from motor.motor import LkMotor
+from motor.simulator import SimulatedBus
+from motor.transport import LoopbackTransport
+
+
+def test_silent_motor_marks_snapshot_stale_and_controller_holds():
+    sim = SimulatedBus([1, 2])
+    bus = LkBus(LoopbackTransport(sim), timeout=0.002)
+    m1 = LkMotor(bus=bus, motor_id=1)
+    m2 = LkMotor(bus=bus, motor_id=2)
+    poller = BackgroundPoller([m1, m2])
+    controller = MITController(m1, m2, poller=poller)
+
+    poller.poll_once()
+    assert not m1.snapshot.stale and not m2.snapshot.stale
+    controller.step()
+    assert m1 in poller._pending and m2 in poller._pending
+
+    del sim.motors[2]  # 电机 2 不再应答
+    poller.poll_once()
+    poller._pending.clear()
+    assert not m1.snapshot.stale
+    assert m2.snapshot.stale
+
+    controller.step()
+    assert controller.stale_ticks == 1
+    assert not poller._pending
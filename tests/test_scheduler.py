@@ -0,0 +1,23 @@
+import time
+from motor.bus import LkBus
+from motor.scheduler import BusScheduler, DIAGNOSTIC
+from motor.simulator import SimulatedBus
+from motor.transport import LoopbackTransport
+
+
+def test_task_with_one_slow_run_is_not_starved():
+    bus = LkBus(LoopbackTransport(SimulatedBus([1])))
+    scheduler = BusScheduler(bus, cycle_hz=500.0)
+    calls = []
+
+    def diagnostic():
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            time.sleep(0.02)  # 例如对失联电机的一次超时，远超每周期的空闲时间
+
+    task = scheduler.add_periodic("status1", diagnostic, 250.0, DIAGNOSTIC)
+    for _ in range(100):
+        scheduler.cycle()
+        time.sleep(scheduler.period)
+    assert task.runs > 10
+    assert task.deferrals < 50